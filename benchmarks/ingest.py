@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+from pathlib import Path
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RAW_DATA = PROJECT_ROOT / 'data/raw/heart.csv'
+TARGET = 'HeartDisease'
+MISSING_VALS_COLS = ['Cholesterol', 'RestingBP']
+N_ROWS = 918
+
+
+def synthetic_rows(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    if RAW_DATA.exists():
+        # Bootstrap rows of the real dataset so value distributions match
+        return pd.read_csv(RAW_DATA).sample(
+            n_rows, replace=True, random_state=seed, ignore_index=True
+        )
+
+    return pd.DataFrame(
+        {
+            'Age': rng.integers(28, 78, n_rows),
+            'Sex': rng.choice(['M', 'F'], n_rows),
+            'ChestPainType': rng.choice(['TA', 'ATA', 'NAP', 'ASY'], n_rows),
+            'RestingBP': rng.integers(80, 200, n_rows),
+            'Cholesterol': rng.choice([0, *range(85, 600)], n_rows),
+            'FastingBS': rng.integers(0, 2, n_rows),
+            'RestingECG': rng.choice(['Normal', 'ST', 'LVH'], n_rows),
+            'MaxHR': rng.integers(60, 203, n_rows),
+            'ExerciseAngina': rng.choice(['Y', 'N'], n_rows),
+            'Oldpeak': rng.normal(0.9, 1.1, n_rows).round(1),
+            'ST_Slope': rng.choice(['Up', 'Flat', 'Down'], n_rows),
+            TARGET: rng.integers(0, 2, n_rows),
+        }
+    )
+
+
+def measure(mode: str, csv_path: str, cache_dir: str) -> dict:
+    # Runs in a fresh interpreter, so ru_maxrss is the peak of this mode alone
+    from heart_failure_prediction.ingest import ingest, load_cached
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    if mode == 'csv':
+        df = pd.read_csv(csv_path)
+    elif mode == 'ingest':
+        path = ingest(csv_path, cache_dir, TARGET, MISSING_VALS_COLS)
+        df = load_cached(path, memory_map=False)
+    else:
+        path = ingest(csv_path, cache_dir, TARGET, MISSING_VALS_COLS)
+        df = load_cached(path, memory_map=mode == 'cached-mmap')
+
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        'seconds': elapsed,
+        'peak_rss_mib': peak / 1024,
+        'peak_delta_mib': (peak - baseline) / 1024,
+        'frame_mib': df.memory_usage(deep=True).sum() / 1024 / 1024,
+    }
+
+
+def run_mode(mode: str, csv_path: str, cache_dir: str) -> dict:
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(
+            filter(None, [str(PROJECT_ROOT / 'src'), os.getenv('PYTHONPATH')])
+        ),
+    }
+    output = subprocess.run(
+        [sys.executable, __file__, '--measure', mode, csv_path, cache_dir],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Raw CSV parsing vs the typed Feather cache at 1x and 1000x'
+    )
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 1000])
+    parser.add_argument('--measure', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    print(
+        f'{"scale":>6} {"rows":>9} {"mode":>12} {"seconds":>8} '
+        f'{"peak RSS":>9} {"peak delta":>10} {"frame MiB":>9}'
+    )
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'heart.csv')
+            synthetic_rows(N_ROWS * scale).to_csv(csv_path, index=False)
+
+            # 'ingest' is the one-off conversion, the cached modes reuse its output
+            for mode in ['csv', 'ingest', 'cached', 'cached-mmap']:
+                r = run_mode(mode, csv_path, tmp)
+                print(
+                    f'{scale:>5}x {N_ROWS * scale:>9} {mode:>12} '
+                    f'{r["seconds"]:>8.3f} {r["peak_rss_mib"]:>9.1f} '
+                    f'{r["peak_delta_mib"]:>10.1f} {r["frame_mib"]:>9.2f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import psutil
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GUNICORN_CONF = PROJECT_ROOT / 'src/heart_failure_prediction/serving/gunicorn_conf.py'
+
+RECORD = {
+    'Age': 45,
+    'Sex': 'M',
+    'ChestPainType': 'ATA',
+    'RestingBP': 130,
+    'Cholesterol': 230,
+    'FastingBS': 0,
+    'RestingECG': 'Normal',
+    'MaxHR': 140,
+    'ExerciseAngina': 'N',
+    'Oldpeak': 1.5,
+    'ST_Slope': 'Flat',
+}
+
+
+def start_server(n_workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        'WEB_CONCURRENCY': str(n_workers),
+        'BIND': f'127.0.0.1:{port}',
+        'PYTHONPATH': os.pathsep.join(
+            filter(None, [str(PROJECT_ROOT / 'src'), os.getenv('PYTHONPATH')])
+        ),
+    }
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', str(GUNICORN_CONF)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(url: str, n_workers: int, server: psutil.Process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (
+                httpx.get(f'{url}/health').status_code == 200
+                and len(server.children()) == n_workers
+            ):
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f'Server with {n_workers} worker(s) did not become ready')
+
+
+def run_client(url: str, duration: float) -> list[float]:
+    latencies = []
+    with httpx.Client(base_url=url) as client:
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = client.post('/predict', json=RECORD)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def worker_memory(server: psutil.Process) -> dict:
+    rss, pss, uss = [], [], []
+    for worker in server.children():
+        info = worker.memory_full_info()
+        rss.append(info.rss)
+        pss.append(getattr(info, 'pss', info.rss))
+        uss.append(info.uss)
+    mib = 1024 * 1024
+    return {
+        'rss_mib': statistics.mean(rss) / mib,
+        'pss_mib': statistics.mean(pss) / mib,
+        'uss_mib': statistics.mean(uss) / mib,
+        'total_pss_mib': (sum(pss) + server.memory_full_info().pss) / mib,
+    }
+
+
+def benchmark(n_workers: int, clients: int, duration: float, port: int) -> dict:
+    url = f'http://127.0.0.1:{port}'
+    server = start_server(n_workers, port)
+    try:
+        process = psutil.Process(server.pid)
+        wait_until_ready(url, n_workers, process)
+        run_client(url, 1.0)
+
+        with ProcessPoolExecutor(max_workers=clients) as pool:
+            futures = [pool.submit(run_client, url, duration) for _ in range(clients)]
+            latencies = [lat for f in futures for lat in f.result()]
+
+        return {
+            'workers': n_workers,
+            'req_per_s': len(latencies) / duration,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': statistics.quantiles(latencies, n=20)[-1] * 1000,
+            **worker_memory(process),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Throughput and per-worker memory of the preforked API server'
+    )
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--clients', type=int, default=2 * multiprocessing.cpu_count())
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    header = (
+        f'{"workers":>7} {"req/s":>8} {"p50 ms":>7} {"p95 ms":>7} '
+        f'{"RSS/w":>7} {"PSS/w":>7} {"USS/w":>7} {"PSS tot":>8}'
+    )
+    print(header)
+    for n_workers in range(1, args.max_workers + 1):
+        r = benchmark(n_workers, args.clients, args.duration, args.port)
+        print(
+            f'{r["workers"]:>7} {r["req_per_s"]:>8.1f} {r["p50_ms"]:>7.2f} '
+            f'{r["p95_ms"]:>7.2f} {r["rss_mib"]:>7.1f} {r["pss_mib"]:>7.1f} '
+            f'{r["uss_mib"]:>7.1f} {r["total_pss_mib"]:>8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
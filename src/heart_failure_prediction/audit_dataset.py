@@ -0,0 +1,86 @@
+import argparse
+import glob
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from heart_failure_prediction.serving.audit import AUDIT_SCHEMA, AUDIT_SUFFIX
+from heart_failure_prediction.serving.columnar import COLUMN_CONSTRAINTS
+
+logger = logging.getLogger(__name__)
+
+TARGET = 'HeartDisease'
+
+
+def read_batches(path: str) -> list[pa.RecordBatch]:
+    # Files left .inprogress by a killed worker end in a partial batch, every
+    # batch before it is complete
+    batches = []
+    try:
+        with pa.ipc.open_stream(pa.memory_map(path)) as reader:
+            for batch in reader:
+                batches.append(batch)
+    except (pa.ArrowInvalid, OSError) as e:
+        logger.warning(f'Read {len(batches)} complete batches from {path}: {e}')
+
+    return batches
+
+
+def load_audit_log(log_dir: str) -> pd.DataFrame:
+    # Includes files that are still being written or whose worker died
+    paths = sorted(glob.glob(os.path.join(log_dir, f'*{AUDIT_SUFFIX}*')))
+
+    if not paths:
+        raise FileNotFoundError(f'No audit log files found in {log_dir}')
+
+    batches = [batch for path in paths for batch in read_batches(path)]
+    return pa.Table.from_batches(batches, schema=AUDIT_SCHEMA).to_pandas()
+
+
+def build_training_set(log_dir: str, labels_path: str) -> pd.DataFrame:
+    logs = load_audit_log(log_dir)
+    labels = pd.read_csv(labels_path, usecols=['request_id', TARGET])
+
+    # /explain often follows /predict for the same request id
+    logs = logs.sort_values('timestamp').drop_duplicates('request_id', keep='first')
+    labelled = logs.merge(labels, on='request_id', how='inner', validate='1:1')
+
+    input_columns = list(COLUMN_CONSTRAINTS)
+    dataset = labelled.sort_values('timestamp')[[*input_columns, TARGET]]
+
+    # heart.csv encodes missing measurements as 0, which ZeroImputer expects
+    nullable = [col for col, spec in COLUMN_CONSTRAINTS.items() if spec['nullable']]
+    dataset = dataset.fillna({col: 0 for col in nullable})
+    dataset[nullable] = dataset[nullable].astype('int64')
+
+    logger.info(f'{len(dataset)} of {len(logs)} audited predictions have labels')
+    return dataset.reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description='Join the prediction audit log with labels into a training CSV'
+    )
+    parser.add_argument('log_dir', help='directory with audit-*.arrows files')
+    parser.add_argument('labels', help='CSV with request_id and HeartDisease columns')
+    parser.add_argument('output', help='CSV readable by train.load_data')
+    parser.add_argument(
+        '--append',
+        action='store_true',
+        help='append to an existing CSV, e.g. data/raw/heart.csv for incremental '
+        'training',
+    )
+    args = parser.parse_args()
+
+    dataset = build_training_set(args.log_dir, args.labels)
+
+    if args.append and os.path.exists(args.output):
+        dataset.to_csv(args.output, mode='a', header=False, index=False)
+    else:
+        dataset.to_csv(args.output, index=False)
+
+    print(f'{len(dataset)} labelled rows written to {args.output}')
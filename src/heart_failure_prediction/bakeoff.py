@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import logging
+import os
+import pickle
+import statistics
+import time
+
+import hydra
+from hydra.core.hydra_config import HydraConfig
+import joblib
+import mlflow
+from omegaconf import DictConfig, OmegaConf
+import pandas as pd
+from sklearn.ensemble._forest import BaseForest
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+from xgboost import XGBModel
+
+from heart_failure_prediction.config import PROJECT_ROOT
+from heart_failure_prediction.train import (
+    build_pipeline,
+    evaluate,
+    load_training_data,
+    split_data,
+)
+
+logger = logging.getLogger(__name__)
+
+# Filled once per worker process from the memory-mapped training data
+_shared = {}
+
+
+def load_model_configs(names: list) -> dict:
+    paths = sorted(glob.glob(os.path.join(PROJECT_ROOT, 'conf', 'model', '*.yaml')))
+    configs = {os.path.splitext(os.path.basename(p))[0]: p for p in paths}
+
+    unknown = set(names) - set(configs)
+    if unknown:
+        raise ValueError(f'Unknown model configs: {sorted(unknown)}')
+
+    return {
+        name: OmegaConf.load(path)
+        for name, path in configs.items()
+        if not names or name in names
+    }
+
+
+def split_threads(n_models: int, n_workers: int | None = None) -> tuple[int, int]:
+    n_cpus = os.cpu_count() or 1
+    n_workers = min(n_models, n_workers or n_cpus)
+    return n_workers, max(1, n_cpus // n_workers)
+
+
+def set_n_threads(estimator, n_threads: int):
+    # Other estimators are single threaded apart from BLAS, which the worker's
+    # threadpool limit already covers
+    if isinstance(estimator, (XGBModel, BaseForest)):
+        estimator.set_params(n_jobs=n_threads)
+
+
+def _init_worker(data_path: str, n_threads: int):
+    _shared.update(joblib.load(data_path, mmap_mode='r'))
+    threadpool_limits(limits=n_threads)
+
+
+def _fit_estimator(name: str, estimator) -> tuple:
+    start = time.perf_counter()
+    estimator.fit(_shared['X_train'], _shared['y_train'])
+    return name, estimator, time.perf_counter() - start
+
+
+def measure_latency(model: Pipeline, X, repeats: int) -> dict:
+    single_row = X.iloc[:1]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(single_row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch_time = time.perf_counter() - start
+
+    return {
+        'latency_ms': statistics.median(timings) * 1000,
+        'batch_latency_us_per_row': batch_time / len(X) * 1e6,
+    }
+
+
+def run_bakeoff(
+    cfg: DictConfig, model_cfgs: dict, X_train, X_test, y_train, y_test, work_dir: str
+) -> tuple[pd.DataFrame, dict]:
+    # The preprocessing is identical for every model config, so it is fitted once
+    # and only the estimators are trained per model
+    preprocessor = build_pipeline(cfg).named_steps['preprocessing']
+    X_train_transformed = preprocessor.fit_transform(X_train, y_train)
+
+    data_path = os.path.join(work_dir, 'bakeoff_data.joblib')
+    joblib.dump(
+        {'X_train': X_train_transformed, 'y_train': y_train.to_numpy()}, data_path
+    )
+
+    n_workers, n_threads = split_threads(len(model_cfgs), cfg.bakeoff.n_workers)
+    logger.info(
+        f'Fitting {len(model_cfgs)} models in {n_workers} processes '
+        f'with {n_threads} thread(s) each'
+    )
+
+    estimators = {}
+    for name, model_cfg in model_cfgs.items():
+        estimators[name] = hydra.utils.instantiate(model_cfg.estimator)
+        set_n_threads(estimators[name], n_threads)
+
+    with ProcessPoolExecutor(
+        n_workers, initializer=_init_worker, initargs=(data_path, n_threads)
+    ) as executor:
+        fitted = list(executor.map(_fit_estimator, estimators, estimators.values()))
+    os.remove(data_path)
+
+    rows = []
+    pipelines = {}
+    # Latency is measured one model at a time, after the pool is gone, so the
+    # models don't compete for the CPU
+    for name, estimator, train_time in fitted:
+        model = Pipeline([('preprocessing', preprocessor), ('model', estimator)])
+        pipelines[name] = model
+
+        rows.append(
+            {
+                'model': name,
+                'model_class': estimator.__class__.__name__,
+                **evaluate(model, X_test, y_test),
+                'train_time_s': train_time,
+                **measure_latency(model, X_test, cfg.bakeoff.latency_repeats),
+                'model_size_kb': len(pickle.dumps(model)) / 1024,
+                'n_threads': n_threads,
+            }
+        )
+
+    table = (
+        pd.DataFrame(rows)
+        .sort_values([cfg.bakeoff.rank_by, 'latency_ms'], ascending=[False, True])
+        .reset_index(drop=True)
+    )
+    table.insert(0, 'rank', range(1, len(table) + 1))
+
+    return table, pipelines
+
+
+@hydra.main(
+    config_path=os.path.join(PROJECT_ROOT, 'conf'),
+    config_name='config',
+    version_base='1.2',
+)
+def main(cfg: DictConfig) -> float:
+    mlflow.set_experiment('Heart failure prediction')
+
+    model_cfgs = load_model_configs(list(cfg.bakeoff.models))
+
+    split_keys = ('target', 'test_size', 'random_state')
+    for name, model_cfg in model_cfgs.items():
+        if any(model_cfg.get(k) != cfg.model[k] for k in split_keys):
+            logger.warning(
+                f'{name} sets a different train/test split, all models share '
+                'the split of the selected model config here'
+            )
+
+    data = load_training_data(cfg)
+    X_train, X_test, y_train, y_test = split_data(cfg, data)
+
+    output_dir = HydraConfig.get().runtime.output_dir
+    table, pipelines = run_bakeoff(
+        cfg, model_cfgs, X_train, X_test, y_train, y_test, work_dir=output_dir
+    )
+
+    table_path = os.path.join(output_dir, 'bakeoff.csv')
+    table.to_csv(table_path, index=False)
+    logger.info(f'Bake-off results:\n{table.to_string(index=False)}')
+
+    with mlflow.start_run(run_name='bake-off'):
+        mlflow.log_params(cfg.processing)
+        mlflow.log_params(cfg.bakeoff)
+        mlflow.log_param('n_features', X_train.shape[1])
+        mlflow.log_artifact(table_path)
+
+        for row in table.to_dict('records'):
+            name = row['model']
+            with mlflow.start_run(run_name=row['model_class'], nested=True):
+                mlflow.log_params(model_cfgs[name])
+                mlflow.log_param('model_class', row['model_class'])
+                mlflow.log_param('n_threads', row['n_threads'])
+                mlflow.log_metrics(
+                    {
+                        k: v
+                        for k, v in row.items()
+                        if k not in ('model', 'model_class', 'n_threads')
+                    }
+                )
+                mlflow.sklearn.log_model(pipelines[name], name='model')
+
+        mlflow.log_param('best_model', table.loc[0, 'model'])
+        logger.info(f'Bake-off logged to MLflow, best model: {table.loc[0, "model"]}')
+
+    return float(table.loc[0, cfg.bakeoff.rank_by])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import bisect
+import math
+import mmap
+import threading
+
+import numpy as np
+import pandas as pd
+
+PSI_EPSILON = 1e-4
+
+
+def _is_missing(value, zero_is_missing: bool) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return zero_is_missing and value == 0
+
+
+def _missing_mask(values: pd.Series, zero_is_missing: bool) -> np.ndarray:
+    mask = values.isna().to_numpy()
+    if zero_is_missing:
+        mask |= (values == 0).to_numpy()
+    return mask
+
+
+def build_reference(
+    df: pd.DataFrame,
+    num_features: list,
+    cat_features: list,
+    missing_vals_cols: list,
+    n_bins: int = 10,
+) -> dict:
+    reference = {'n': len(df), 'numeric': {}, 'categorical': {}, 'zero_rate': {}}
+
+    for col in num_features:
+        missing = _missing_mask(df[col], col in missing_vals_cols)
+        values = df[col].to_numpy(dtype=float)[~missing]
+
+        # Reference deciles as bin edges, deduplicated for discrete columns
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.unique(np.quantile(values, quantiles)) if len(values) else values
+        counts = np.bincount(
+            np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1
+        )
+
+        reference['numeric'][col] = {
+            'edges': edges.tolist(),
+            'counts': counts.tolist(),
+        }
+
+    for col in cat_features:
+        value_counts = df[col].value_counts()
+        reference['categorical'][col] = {
+            'categories': [str(c) for c in value_counts.index],
+            'counts': value_counts.tolist(),
+        }
+
+    for col in missing_vals_cols:
+        zeros = int(_missing_mask(df[col], zero_is_missing=True).sum())
+        reference['zero_rate'][col] = {'counts': [len(df) - zeros, zeros]}
+
+    return reference
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    p = np.clip(expected / max(expected.sum(), 1), PSI_EPSILON, None)
+    q = np.clip(actual / max(actual.sum(), 1), PSI_EPSILON, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    # Evaluated at the bin edges, exact when the edges cover every distinct value
+    p = np.cumsum(expected) / max(expected.sum(), 1)
+    q = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+class DriftMonitor:
+    def __init__(
+        self,
+        reference: dict,
+        n_workers: int = 1,
+        threads_per_worker: int = 64,
+        buffer=None,
+    ):
+        self.reference = reference
+
+        # All counters live in one flat vector; each feature owns a slice of it.
+        # Slot 0 counts records.
+        size = 1
+        self._numeric = []
+        for col, summary in reference['numeric'].items():
+            self._numeric.append((col, summary['edges'], size))
+            size += len(summary['edges']) + 1
+
+        self._categorical = []
+        for col, summary in reference['categorical'].items():
+            index = {category: i for i, category in enumerate(summary['categories'])}
+            # One extra slot for values never seen at training time
+            self._categorical.append((col, index, size, len(index)))
+            size += len(index) + 1
+
+        self._zero_rate = []
+        for col in reference['zero_rate']:
+            self._zero_rate.append((col, size))
+            size += 2
+
+        self._zero_cols = set(reference['zero_rate'])
+        self._size = size
+
+        # The vectors are rows of a table in shared memory, one block of rows per
+        # worker process and one row per thread. A monitor created before the
+        # workers fork is shared by all of them, so counts() covers all traffic,
+        # and since each thread owns its row the hot path never takes a lock.
+        n_counters = n_workers * threads_per_worker * size
+        self.buffer = buffer if buffer is not None else mmap.mmap(-1, n_counters * 8)
+        self._table = np.frombuffer(
+            self.buffer, dtype=np.int64, count=n_counters
+        ).reshape(n_workers, threads_per_worker, size)
+        self._lock = threading.Lock()
+        self.attach(0)
+
+    def attach(self, worker: int | None):
+        # Called in each worker after the fork. A replacement worker reuses the
+        # block of the one it replaces and adds to its counts; None keeps the
+        # counts private to this process.
+        with self._lock:
+            self._local = threading.local()
+            self._private = []
+            self._block = self._table[worker] if worker is not None else []
+            self._n_claimed = 0
+
+    def _shard(self) -> np.ndarray:
+        shard = getattr(self._local, 'shard', None)
+
+        if shard is None:
+            with self._lock:
+                if self._n_claimed < len(self._block):
+                    shard = self._block[self._n_claimed]
+                    self._n_claimed += 1
+                else:
+                    # Out of shared rows: still counted, but only by this process
+                    shard = np.zeros(self._size, dtype=np.int64)
+                    self._private.append(shard)
+            self._local.shard = shard
+
+        return shard
+
+    def update(self, record: dict):
+        counts = self._shard()
+        counts[0] += 1
+
+        for col, edges, offset in self._numeric:
+            value = record.get(col)
+            if not _is_missing(value, col in self._zero_cols):
+                counts[offset + bisect.bisect_right(edges, value)] += 1
+
+        for col, index, offset, other in self._categorical:
+            value = record.get(col)
+            value = getattr(value, 'value', value)
+            counts[offset + index.get(value, other)] += 1
+
+        for col, offset in self._zero_rate:
+            counts[offset + _is_missing(record.get(col), zero_is_missing=True)] += 1
+
+    def update_frame(self, df: pd.DataFrame):
+        counts = self._shard()
+        counts[0] += len(df)
+
+        for col, edges, offset in self._numeric:
+            missing = _missing_mask(df[col], col in self._zero_cols)
+            values = df[col].to_numpy(dtype=float)[~missing]
+            bins = np.searchsorted(edges, values, side='right')
+            counts[offset : offset + len(edges) + 1] += np.bincount(
+                bins, minlength=len(edges) + 1
+            )
+
+        for col, index, offset, other in self._categorical:
+            codes = df[col].astype(str).map(index).fillna(other).to_numpy(dtype=int)
+            counts[offset : offset + other + 1] += np.bincount(
+                codes, minlength=other + 1
+            )
+
+        for col, offset in self._zero_rate:
+            zeros = int(_missing_mask(df[col], zero_is_missing=True).sum())
+            counts[offset] += len(df) - zeros
+            counts[offset + 1] += zeros
+
+    def counts(self) -> np.ndarray:
+        with self._lock:
+            private = list(self._private)
+        return sum(private, self._table.sum(axis=(0, 1)))
+
+    def scores(self) -> dict:
+        counts = self.counts()
+        result = {
+            'n_records': int(counts[0]),
+            'n_reference': self.reference['n'],
+            'numeric': {},
+            'categorical': {},
+            'zero_rate': {},
+        }
+
+        if counts[0] == 0:
+            return result
+
+        for col, edges, offset in self._numeric:
+            expected = np.asarray(self.reference['numeric'][col]['counts'])
+            actual = counts[offset : offset + len(edges) + 1]
+            result['numeric'][col] = {
+                'psi': psi(expected, actual),
+                'ks': ks(expected, actual),
+            }
+
+        for col, _, offset, other in self._categorical:
+            expected = np.append(self.reference['categorical'][col]['counts'], 0)
+            actual = counts[offset : offset + other + 1]
+            result['categorical'][col] = {
+                'psi': psi(expected, actual),
+                'unseen_rate': float(actual[-1] / counts[0]),
+            }
+
+        for col, offset in self._zero_rate:
+            expected = np.asarray(self.reference['zero_rate'][col]['counts'])
+            actual = counts[offset : offset + 2]
+            result['zero_rate'][col] = {
+                'reference': float(expected[1] / max(expected.sum(), 1)),
+                'current': float(actual[1] / max(actual.sum(), 1)),
+                'psi': psi(expected, actual),
+            }
+
+        return result
@@ -0,0 +1,165 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+
+from matplotlib import pyplot as plt
+import numpy as np
+import pandas as pd
+import shap
+from shap.utils._exceptions import InvalidModelError
+from sklearn.inspection import permutation_importance
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+QUANTILES = np.array([0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0])
+
+# Filled once per worker process
+_worker_explainer = None
+
+
+def make_explainer(estimator, background):
+    for explainer_class in (shap.TreeExplainer, shap.LinearExplainer):
+        try:
+            return explainer_class(estimator, background)
+        except InvalidModelError:
+            continue
+    return None
+
+
+def positive_class_values(shap_values) -> np.ndarray:
+    # Tree explainers of sklearn classifiers return one set of values per class
+    shap_values = np.asarray(shap_values)
+    return shap_values[..., 1] if shap_values.ndim == 3 else shap_values
+
+
+def input_columns_of(feature_names, input_columns) -> list:
+    # Maps every transformed feature (one-hot columns, missing indicators) to
+    # the input column it was derived from
+    columns = []
+    for raw_name in feature_names:
+        clean_name = raw_name.replace('cat_pipeline__', '').replace(
+            'num_pipeline__', ''
+        )
+
+        if clean_name.startswith('missingindicator_'):
+            clean_name = clean_name.replace('missingindicator_', '')
+
+        matched_key = next((k for k in input_columns if clean_name.startswith(k)), None)
+        columns.append(matched_key or clean_name)
+
+    return columns
+
+
+def aggregate_by_input(shap_values, feature_names, input_columns) -> pd.DataFrame:
+    # SHAP values are additive, so an input column's contribution is the sum
+    # over its transformed features
+    shap_values = np.atleast_2d(shap_values)
+    columns = input_columns_of(feature_names, input_columns)
+    unmatched = [c for c in dict.fromkeys(columns) if c not in input_columns]
+
+    aggregated = (
+        pd.DataFrame(shap_values, columns=pd.Index(columns, dtype=object))
+        .T.groupby(level=0, sort=False)
+        .sum()
+        .T
+    )
+    return aggregated.reindex(columns=[*input_columns, *unmatched], fill_value=0.0)
+
+
+def _init_worker(explainer, n_threads: int):
+    global _worker_explainer
+    _worker_explainer = explainer
+    threadpool_limits(limits=n_threads)
+
+
+def _explain_chunk(X) -> np.ndarray:
+    return positive_class_values(_worker_explainer.shap_values(X))
+
+
+def chunked_shap_values(explainer, X, chunk_size: int, n_workers: int) -> np.ndarray:
+    chunks = [
+        X[start : start + chunk_size] for start in range(0, X.shape[0], chunk_size)
+    ]
+    n_workers = min(n_workers, len(chunks))
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+
+    # Not fork: the caller has usually just trained with OpenMP, and forking
+    # after its thread pool has started can hang the children
+    with ProcessPoolExecutor(
+        n_workers,
+        mp_context=multiprocessing.get_context('forkserver'),
+        initializer=_init_worker,
+        initargs=(explainer, n_threads),
+    ) as executor:
+        return np.concatenate(list(executor.map(_explain_chunk, chunks)))
+
+
+def global_shap_summary(shap_frame: pd.DataFrame, X: pd.DataFrame) -> dict:
+    values = shap_frame.to_numpy()
+
+    value_quantiles = np.full((shap_frame.shape[1], len(QUANTILES)), np.nan)
+    for i, col in enumerate(shap_frame.columns):
+        if col in X and pd.api.types.is_numeric_dtype(X[col]):
+            value_quantiles[i] = np.nanquantile(X[col].to_numpy(dtype=float), QUANTILES)
+
+    return {
+        'method': np.array('shap'),
+        'columns': np.array(shap_frame.columns, dtype=str),
+        'quantiles': QUANTILES,
+        'importance': np.abs(values).mean(axis=0),
+        'shap_quantiles': np.quantile(values, QUANTILES, axis=0).T,
+        'value_quantiles': value_quantiles,
+    }
+
+
+def global_permutation_summary(
+    model: Pipeline, X: pd.DataFrame, y, n_repeats: int, n_workers: int
+) -> dict:
+    # Permutes the raw input columns, so no aggregation is needed
+    result = permutation_importance(
+        model, X, y, n_repeats=n_repeats, n_jobs=n_workers, random_state=0
+    )
+
+    return {
+        'method': np.array('permutation'),
+        'columns': np.array(X.columns, dtype=str),
+        'quantiles': QUANTILES,
+        'importance': result.importances_mean,
+        'importance_quantiles': np.quantile(result.importances, QUANTILES, axis=1).T,
+    }
+
+
+def plot_global_importance(summary: dict, path: str):
+    order = np.argsort(summary['importance'])
+    label = (
+        'mean(|SHAP value|)'
+        if summary['method'] == 'shap'
+        else 'Mean decrease in score when permuted'
+    )
+
+    plt.figure(figsize=(8, 0.4 * len(order) + 1.5))
+    plt.barh(summary['columns'][order], summary['importance'][order])
+    plt.xlabel(label)
+    plt.title('Global feature importance')
+    plt.grid(axis='x', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def plot_shap_beeswarm(shap_frame: pd.DataFrame, X: pd.DataFrame, path: str):
+    # Categorical inputs are coloured by their category codes
+    features = pd.DataFrame(
+        {
+            col: X[col]
+            if pd.api.types.is_numeric_dtype(X[col])
+            else X[col].astype('category').cat.codes
+            for col in shap_frame.columns
+            if col in X
+        }
+    )
+
+    shap.summary_plot(shap_frame[features.columns].to_numpy(), features, show=False)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
@@ -33,4 +33,8 @@ local_path = mlflow.artifacts.download_artifacts(
     run_id=run_id, artifact_path=artifact_path, dst_path=str(DEST_DIR)
 )
 
+monitoring_path = mlflow.artifacts.download_artifacts(
+    run_id=run_id, artifact_path='monitoring_artifact', dst_path=str(DEST_DIR)
+)
+
 print('Export complete.')
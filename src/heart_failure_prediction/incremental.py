@@ -0,0 +1,248 @@
+import copy
+import logging
+import os
+import time
+
+import hydra
+import mlflow
+import numpy as np
+from omegaconf import DictConfig
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble._forest import BaseForest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from xgboost import XGBModel
+
+from heart_failure_prediction.config import PROJECT_ROOT
+from heart_failure_prediction.manifest import (
+    appended_rows,
+    held_out_rows,
+    read_manifest,
+    write_manifest,
+)
+from heart_failure_prediction.train import (
+    build_pipeline,
+    evaluate,
+    load_training_data,
+    log_drift_reference,
+    log_explainer,
+    log_global_explanation,
+    split_data,
+)
+from heart_failure_prediction.train import main as full_training
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalUpdateError(Exception):
+    pass
+
+
+def _check_categories(encoder: OneHotEncoder, X, columns: list):
+    X = np.asarray(X, dtype=object)
+
+    for i, categories in enumerate(encoder.categories_):
+        unseen = set(pd.unique(X[:, i])) - set(categories)
+        if unseen:
+            # A wider one-hot encoding changes the feature space the previous
+            # model was trained on
+            raise IncrementalUpdateError(
+                f'New categories {sorted(unseen)} for {columns[i]}'
+            )
+
+
+def check_preprocessing(preprocessor: ColumnTransformer, X_new):
+    # The fitted transform stays frozen: the previous trees split on its scaled
+    # values and imputed fill values, so refreshing its statistics would change
+    # the old model's predictions before any new tree is added
+    for _, transformer, columns in preprocessor.transformers_:
+        if not isinstance(transformer, Pipeline):
+            continue
+
+        X = X_new[columns]
+        for _, step in transformer.steps:
+            if isinstance(step, OneHotEncoder):
+                _check_categories(step, X, columns)
+            X = step.transform(X)
+
+
+def continue_training(estimator, X_new, y_new, n_new_estimators: int):
+    if len(np.unique(y_new)) < len(estimator.classes_):
+        raise IncrementalUpdateError('Appended rows do not contain every class')
+
+    if isinstance(estimator, XGBModel):
+        booster = estimator.get_booster()
+        n_rounds = booster.num_boosted_rounds()
+        estimator.set_params(n_estimators=n_new_estimators)
+        estimator.fit(X_new, y_new, xgb_model=booster)
+        estimator.set_params(n_estimators=n_rounds + n_new_estimators)
+    elif isinstance(estimator, BaseForest):
+        estimator.set_params(
+            warm_start=True, n_estimators=estimator.n_estimators + n_new_estimators
+        )
+        estimator.fit(X_new, y_new)
+        estimator.set_params(warm_start=False)
+    else:
+        raise IncrementalUpdateError(
+            f"{estimator.__class__.__name__} can't continue training"
+        )
+
+
+def split_seen(cfg: DictConfig, seen: pd.DataFrame, test_rows: list) -> tuple:
+    # Reuses the recorded split: re-splitting the seen rows would move rows the
+    # previous model trained on into the test set
+    is_test = np.zeros(len(seen), dtype=bool)
+    is_test[test_rows] = True
+
+    y = seen[cfg.model.target]
+    X = seen.drop(cfg.model.target, axis=1)
+
+    return X[~is_test], X[is_test], y[~is_test], y[is_test]
+
+
+def train_incremental(cfg: DictConfig, previous: Pipeline, data, manifest: dict):
+    n_seen = manifest['n_rows']
+    X_train_old, X_test_old, y_train_old, y_test_old = split_seen(
+        cfg, data.iloc[:n_seen], manifest['test_rows']
+    )
+    X_train_new, X_test_new, y_train_new, y_test_new = split_data(
+        cfg, data.iloc[n_seen:]
+    )
+
+    X_train = pd.concat([X_train_old, X_train_new])
+    y_train = pd.concat([y_train_old, y_train_new])
+    X_test = pd.concat([X_test_old, X_test_new])
+    y_test = pd.concat([y_test_old, y_test_new])
+
+    model = copy.deepcopy(previous)
+    preprocessor = model.named_steps['preprocessing']
+    estimator = model.named_steps['model']
+
+    start = time.perf_counter()
+    check_preprocessing(preprocessor, X_train_new)
+    continue_training(
+        estimator,
+        preprocessor.transform(X_train_new),
+        y_train_new,
+        cfg.incremental.n_new_estimators,
+    )
+    incremental_time = time.perf_counter() - start
+
+    scores = evaluate(model, X_test, y_test)
+    metrics = {**scores, 'train_time_s': incremental_time}
+    accepted = True
+
+    if cfg.incremental.gate:
+        full_model = build_pipeline(cfg)
+
+        start = time.perf_counter()
+        full_model.fit(X_train, y_train)
+        full_time = time.perf_counter() - start
+
+        full_scores = evaluate(full_model, X_test, y_test)
+        metrics.update({f'full_{k}': v for k, v in full_scores.items()})
+        metrics['full_train_time_s'] = full_time
+
+        metric = cfg.incremental.gate_metric
+        accepted = (
+            scores[metric] >= full_scores[metric] - cfg.incremental.gate_tolerance
+        )
+        logger.info(
+            f'Gate on {metric}: incremental = {scores[metric]} '
+            f'full = {full_scores[metric]} accepted = {accepted}'
+        )
+
+        if not accepted:
+            model, scores = full_model, full_scores
+
+    return model, scores, metrics, accepted, X_train, X_test, y_test
+
+
+@hydra.main(
+    config_path=os.path.join(PROJECT_ROOT, 'conf'),
+    config_name='config',
+    version_base='1.2',
+)
+def main(cfg: DictConfig) -> float:
+    mlflow.set_experiment('Heart failure prediction')
+
+    manifest_path = hydra.utils.to_absolute_path(cfg.raw_data.manifest_path)
+    manifest = read_manifest(manifest_path)
+
+    if manifest is None:
+        logger.info(f'No training manifest at {manifest_path}, running full training')
+        return full_training(cfg)
+
+    model_class_name = hydra.utils.get_class(cfg.model.estimator._target_).__name__
+
+    if manifest['model_class'] != model_class_name:
+        logger.info(
+            f'Previous model is {manifest["model_class"]}, not {model_class_name}, '
+            'running full training'
+        )
+        return full_training(cfg)
+
+    if 'test_rows' not in manifest:
+        logger.info('Previous test split is unknown, running full training')
+        return full_training(cfg)
+
+    data = load_training_data(cfg)
+    new_rows = appended_rows(data, manifest)
+
+    if new_rows is None:
+        logger.info('Previously seen rows changed, running full training')
+        return full_training(cfg)
+
+    if len(new_rows) < cfg.incremental.min_new_rows:
+        logger.info(f'Only {len(new_rows)} new rows, keeping the previous model')
+        return manifest['scores']['recall']
+
+    previous: Pipeline = mlflow.sklearn.load_model(f'runs:/{manifest["run_id"]}/model')
+
+    try:
+        model, scores, metrics, accepted, X_train, X_test, y_test = train_incremental(
+            cfg, previous, data, manifest
+        )
+    except IncrementalUpdateError as e:
+        logger.info(f'Incremental update not possible ({e}), running full training')
+        return full_training(cfg)
+
+    run_name = f'{model_class_name} (incremental)'
+    with mlflow.start_run(run_name=run_name) as run:
+        mlflow.log_params(cfg.model)
+        mlflow.log_params(cfg.processing)
+        mlflow.log_params(cfg.incremental)
+        mlflow.log_param('model_class', model_class_name)
+        mlflow.log_param('parent_run_id', manifest['run_id'])
+        mlflow.log_param('n_seen_rows', manifest['n_rows'])
+        mlflow.log_param('n_new_rows', len(new_rows))
+
+        mlflow.log_metrics(metrics)
+        mlflow.log_metric('incremental_accepted', int(accepted))
+
+        mlflow.sklearn.log_model(model, name='model')
+        log_explainer(model, X_train)
+        log_drift_reference(cfg, X_train)
+
+        if cfg.explain.enabled:
+            log_global_explanation(cfg, model, X_train, X_test, y_test)
+
+        logger.info(f'Run {run_name} logged to MLflow')
+
+    write_manifest(
+        manifest_path,
+        data,
+        dvc_path=hydra.utils.to_absolute_path(cfg.raw_data.dvc_path),
+        run_id=run.info.run_id,
+        model_class=model_class_name,
+        scores=scores,
+        incremental=accepted,
+        test_rows=held_out_rows(data, X_test),
+    )
+
+    return scores['recall']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from heart_failure_prediction.serving.columnar import (
+    COLUMN_CONSTRAINTS,
+    ColumnValidationError,
+    validate_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _file_md5(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_hash(raw_path: str) -> str:
+    # Hashes the working copy, the .dvc md5 only describes the last `dvc add`
+    # and misses in-place edits
+    return _file_md5(raw_path)
+
+
+def validate_raw(df: pd.DataFrame, target: str, missing_vals_cols: list):
+    errors = []
+
+    if target not in df.columns:
+        errors.append({'loc': ['body', target], 'msg': 'Field required'})
+    elif not df[target].isin([0, 1]).all():
+        errors.append({'loc': ['body', target], 'msg': 'Input should be 0 or 1'})
+
+    try:
+        validate_frame(df, zero_is_missing=tuple(missing_vals_cols))
+    except ColumnValidationError as e:
+        errors.extend(e.errors)
+
+    if errors:
+        raise ColumnValidationError(errors)
+
+
+def to_typed(df: pd.DataFrame, target: str) -> pd.DataFrame:
+    typed = {}
+
+    for name, spec in COLUMN_CONSTRAINTS.items():
+        column = df[name]
+
+        if spec['allowed'] is not None and isinstance(spec['allowed'][0], str):
+            # Fixed categories, so every cache shares the same codes
+            typed[name] = pd.Categorical(column, categories=spec['allowed'])
+        elif spec['allowed'] is not None or spec['integer']:
+            typed[name] = pd.to_numeric(column, downcast='integer')
+        else:
+            downcast = column.astype(np.float32)
+            lossless = np.array_equal(
+                downcast.astype(np.float64), column, equal_nan=True
+            )
+            typed[name] = downcast if lossless else column.astype(np.float64)
+
+    typed[target] = df[target].astype(np.int8)
+
+    return pd.DataFrame(typed)
+
+
+def ingest(
+    raw_path: str,
+    cache_dir: str,
+    target: str,
+    missing_vals_cols: list,
+) -> str:
+    cache_path = os.path.join(cache_dir, f'heart-{data_hash(raw_path)}.feather')
+
+    if os.path.exists(cache_path):
+        logger.info(f'Using cached dataset {cache_path}')
+        return cache_path
+
+    df = pd.read_csv(raw_path)
+    validate_raw(df, target, missing_vals_cols)
+    typed = to_typed(df, target)
+
+    # Uncompressed Arrow IPC, so it can be memory-mapped without decoding
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    feather.write_feather(typed, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+
+    logger.info(f'Cached {len(typed)} validated rows to {cache_path}')
+    return cache_path
+
+
+def load_cached(path: str, memory_map: bool = True) -> pd.DataFrame:
+    table = feather.read_table(path, memory_map=memory_map)
+    # split_blocks lets numeric columns without nulls stay views of the map
+    return table.to_pandas(split_blocks=True, self_destruct=True)
@@ -0,0 +1,78 @@
+from datetime import UTC, datetime
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+def rows_hash(df: pd.DataFrame) -> str:
+    # Canonical dtypes, so the hash doesn't depend on how the CSV was parsed
+    canonical = pd.DataFrame(
+        {
+            col: df[col].astype('float64')
+            if pd.api.types.is_numeric_dtype(df[col])
+            else df[col].astype('object')
+            for col in df.columns
+        }
+    )
+    row_hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def dvc_md5(dvc_path: str) -> str | None:
+    try:
+        with open(dvc_path) as f:
+            return yaml.safe_load(f)['outs'][0]['md5']
+    except (FileNotFoundError, KeyError, IndexError, TypeError):
+        return None
+
+
+def read_manifest(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(path: str, df: pd.DataFrame, dvc_path: str, **fields) -> dict:
+    manifest = {
+        'n_rows': len(df),
+        'rows_hash': rows_hash(df),
+        'columns': list(df.columns),
+        'dvc_md5': dvc_md5(dvc_path),
+        'created_at': datetime.now(UTC).isoformat(),
+        **fields,
+    }
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f'Training manifest written to {path}')
+    return manifest
+
+
+def held_out_rows(df: pd.DataFrame, X_test: pd.DataFrame) -> list[int]:
+    # Row positions of the test split, so later incremental runs keep evaluating
+    # on rows no model in the chain has trained on
+    return sorted(df.index.get_indexer(X_test.index).tolist())
+
+
+def appended_rows(df: pd.DataFrame, manifest: dict) -> pd.DataFrame | None:
+    # None means the previously seen rows were edited, reordered or removed,
+    # so the new data is not a pure append
+    n_rows = manifest['n_rows']
+
+    if list(df.columns) != manifest['columns'] or len(df) < n_rows:
+        return None
+
+    if rows_hash(df.iloc[:n_rows]) != manifest['rows_hash']:
+        return None
+
+    return df.iloc[n_rows:]
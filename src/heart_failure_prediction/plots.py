@@ -1,9 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 import seaborn as sns
 
+# Grid of seaborn's histplot KDE and the resolution of the histogram it is
+# estimated from in aggregated mode
+KDE_GRIDSIZE = 200
+KDE_BINS = 2048
+
+# Two-sided 95% interval for sampled summaries
+Z_95 = 1.96
+
+
+def plot_distributions(
+    df,
+    n_cols: int = 4,
+    bins: int = 50,
+    aggregate: bool = False,
+    sample_frac: float | None = None,
+    n_jobs: int = 1,
+):
+    if aggregate:
+        summaries = summarize(df, bins=bins, sample_frac=sample_frac, n_jobs=n_jobs)
+        plot_summary_distributions(summaries, n_cols=n_cols, bins=bins)
+        return
 
-def plot_distributions(df, n_cols: int = 4, bins: int = 50):
     cols = df.columns
 
     n_rows = int(np.ceil(len(cols) / n_cols))
@@ -21,7 +45,19 @@ def plot_distributions(df, n_cols: int = 4, bins: int = 50):
         plt.tight_layout()
 
 
-def plot_categorical_countplots(df, target: str, n_cols: int = 3):
+def plot_categorical_countplots(
+    df,
+    target: str,
+    n_cols: int = 3,
+    aggregate: bool = False,
+    sample_frac: float | None = None,
+    n_jobs: int = 1,
+):
+    if aggregate:
+        summaries = summarize(df, target=target, sample_frac=sample_frac, n_jobs=n_jobs)
+        plot_summary_countplots(summaries, target, n_cols=n_cols)
+        return
+
     cat_cols = df.select_dtypes(include=['object']).columns
     cat_cols = [c for c in cat_cols if c != target]
 
@@ -37,3 +73,354 @@ def plot_categorical_countplots(df, target: str, n_cols: int = 3):
         plt.title(f'{col} vs {target}')
         plt.xticks(rotation=45)
         plt.tight_layout()
+
+
+def moments(values: np.ndarray) -> dict:
+    if len(values) == 0:
+        return {
+            'n': 0,
+            'mean': 0.0,
+            'm2': 0.0,
+            'm3': 0.0,
+            'min': np.inf,
+            'max': -np.inf,
+        }
+
+    mean = values.mean()
+    deviations = values - mean
+    return {
+        'n': len(values),
+        'mean': mean,
+        'm2': np.square(deviations).sum(),
+        'm3': np.power(deviations, 3).sum(),
+        'min': values.min(),
+        'max': values.max(),
+    }
+
+
+def merge_moments(a: dict, b: dict) -> dict:
+    # Pairwise update of the central moment sums (Chan et al.), so chunks can be
+    # combined without a second pass over the data
+    if a['n'] == 0:
+        return b
+    if b['n'] == 0:
+        return a
+
+    n = a['n'] + b['n']
+    delta = b['mean'] - a['mean']
+
+    return {
+        'n': n,
+        'mean': a['mean'] + delta * b['n'] / n,
+        'm2': a['m2'] + b['m2'] + delta**2 * a['n'] * b['n'] / n,
+        'm3': a['m3']
+        + b['m3']
+        + delta**3 * a['n'] * b['n'] * (a['n'] - b['n']) / n**2
+        + 3 * delta * (a['n'] * b['m2'] - b['n'] * a['m2']) / n,
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max']),
+    }
+
+
+def skewness(summary: dict) -> float:
+    # Same bias-adjusted estimator as pandas.Series.skew
+    n = summary['n']
+    if n < 3:
+        return np.nan
+
+    m2 = summary['m2'] / n
+    m3 = summary['m3'] / n
+    if abs(m2) < 1e-14:
+        return 0.0
+
+    return float(np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2**1.5)
+
+
+def skewness_se(n: int) -> float:
+    if n < 3:
+        return np.nan
+    return float(np.sqrt(6 * n * (n - 1) / ((n - 2) * (n + 1) * (n + 3))))
+
+
+def _is_categorical(values: pd.Series) -> bool:
+    return not pd.api.types.is_numeric_dtype(values) or isinstance(
+        values.dtype, pd.CategoricalDtype
+    )
+
+
+def _merge_counts(a: pd.Series | None, b: pd.Series) -> pd.Series:
+    if a is None:
+        return b
+    # Keeps the order of first appearance, like seaborn's categorical order
+    return (
+        pd.concat([a, b]).groupby(level=list(range(b.index.nlevels)), sort=False).sum()
+    )
+
+
+def _first_pass(chunk: pd.DataFrame, col: str, target: str | None) -> dict:
+    values = chunk[col]
+
+    if _is_categorical(values):
+        summary = {'kind': 'categorical', 'counts': values.value_counts(sort=False)}
+        if target is not None and col != target:
+            summary['by_target'] = chunk.groupby(
+                [col, target], sort=False, observed=False
+            ).size()
+        return summary
+
+    values = values.to_numpy(dtype=float)
+    return {'kind': 'numeric', **moments(values[~np.isnan(values)])}
+
+
+def _merge_first_pass(a: dict | None, b: dict) -> dict:
+    if a is None:
+        return b
+
+    if b['kind'] == 'numeric':
+        return {'kind': 'numeric', **merge_moments(a, b)}
+
+    merged = {'kind': 'categorical', 'counts': _merge_counts(a['counts'], b['counts'])}
+    if 'by_target' in b:
+        merged['by_target'] = _merge_counts(a['by_target'], b['by_target'])
+    return merged
+
+
+def _second_pass(chunk: pd.DataFrame, col: str, summaries: dict, bins: int) -> dict:
+    values = chunk[col].to_numpy(dtype=float)
+    values = values[~np.isnan(values)]
+    value_range = (summaries[col]['min'], summaries[col]['max'])
+
+    # Same edges as seaborn/numpy derive from the full column
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    kde_counts, _ = np.histogram(values, bins=KDE_BINS, range=value_range)
+
+    return {'counts': counts, 'edges': edges, 'kde_counts': kde_counts}
+
+
+def _summarize_chunks(
+    chunks,
+    target: str | None,
+    bins: int,
+    sample_frac: float | None,
+    random_state: int,
+    n_jobs: int,
+) -> dict:
+    def sampled():
+        for i, chunk in enumerate(chunks()):
+            if sample_frac is None:
+                yield chunk
+            else:
+                # Bernoulli sampling, seeded per chunk so both passes see the
+                # same sample
+                rng = np.random.default_rng(random_state + i)
+                yield chunk[rng.random(len(chunk)) < sample_frac]
+
+    summaries = {}
+
+    with ThreadPoolExecutor(n_jobs) as executor:
+        for chunk in sampled():
+            firsts = executor.map(partial(_first_pass, chunk, target=target), chunk)
+            for col, first in zip(chunk.columns, firsts, strict=True):
+                summaries[col] = _merge_first_pass(summaries.get(col), first)
+
+        # All-missing columns have no range to bin over
+        numeric = [
+            col for col, s in summaries.items() if s['kind'] == 'numeric' and s['n'] > 0
+        ]
+
+        # Histogram ranges are only known after the first pass
+        for chunk in sampled() if numeric else []:
+            seconds = executor.map(
+                partial(_second_pass, chunk, summaries=summaries, bins=bins), numeric
+            )
+            for col, second in zip(numeric, seconds, strict=True):
+                summary = summaries[col]
+                for key in ('counts', 'kde_counts'):
+                    summary[key] = summary.get(key, 0) + second[key]
+                summary['edges'] = second['edges']
+
+    for summary in summaries.values():
+        summary['sample_frac'] = sample_frac
+        if summary['kind'] == 'numeric':
+            summary['skew'] = skewness(summary)
+        if sample_frac is not None:
+            _scale_sampled(summary, sample_frac)
+
+    return summaries
+
+
+def _scale_sampled(summary: dict, sample_frac: float):
+    # Bernoulli sampling: a sampled count c estimates c / f with variance
+    # c (1 - f) / f^2
+    keys = ['counts', 'by_target'] if summary['kind'] == 'categorical' else ['counts']
+    for key in keys:
+        if key in summary:
+            counts = summary[key]
+            summary[f'{key}_se'] = np.sqrt(counts * (1 - sample_frac)) / sample_frac
+            summary[key] = counts / sample_frac
+
+    if summary['kind'] == 'numeric':
+        summary['skew_se'] = skewness_se(summary['n'])
+
+
+def summarize(
+    df: pd.DataFrame,
+    target: str | None = None,
+    bins: int = 50,
+    sample_frac: float | None = None,
+    random_state: int = 0,
+    n_jobs: int = 1,
+) -> dict:
+    return _summarize_chunks(
+        lambda: [df], target, bins, sample_frac, random_state, n_jobs
+    )
+
+
+def summarize_csv(
+    path: str,
+    target: str | None = None,
+    bins: int = 50,
+    chunksize: int = 100_000,
+    usecols: list | None = None,
+    sample_frac: float | None = None,
+    random_state: int = 0,
+    n_jobs: int = 1,
+) -> dict:
+    # Two passes over the file, holding one chunk at a time
+    return _summarize_chunks(
+        lambda: pd.read_csv(path, chunksize=chunksize, usecols=usecols),
+        target,
+        bins,
+        sample_frac,
+        random_state,
+        n_jobs,
+    )
+
+
+def binned_kde(summary: dict, gridsize: int = KDE_GRIDSIZE) -> tuple | None:
+    # Gaussian KDE with Scott's bandwidth evaluated from the fine histogram,
+    # on the grid seaborn uses for histplot(kde=True) (cut=0)
+    n = summary['n']
+    if n < 2 or summary['m2'] <= 0:
+        return None
+
+    bandwidth = np.sqrt(summary['m2'] / (n - 1)) * n ** (-1 / 5)
+    edges = np.linspace(summary['min'], summary['max'], KDE_BINS + 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    weights = summary['kde_counts'] / summary['kde_counts'].sum()
+
+    grid = np.linspace(summary['min'], summary['max'], gridsize)
+    z = (grid[:, None] - centers[None, :]) / bandwidth
+    density = (np.exp(-0.5 * z**2) @ weights) / (bandwidth * np.sqrt(2 * np.pi))
+
+    return grid, density
+
+
+def _plot_summary_histogram(col: str, summary: dict, bins: int):
+    if summary['n'] == 0:
+        # Empty axes, as histplot draws for an all-missing column
+        sns.histplot(data=pd.DataFrame({col: [np.nan]}), x=col, bins=bins)
+        plt.title(f'{col} | Skewness: {round(summary["skew"], 2)}')
+        return
+
+    edges = summary['edges']
+    centers = (edges[:-1] + edges[1:]) / 2
+    counts = summary['counts']
+
+    # One weighted point per bin reproduces the bars of histplot on the raw data
+    ax = sns.histplot(
+        data=pd.DataFrame({col: centers, 'count': counts}),
+        x=col,
+        weights='count',
+        bins=len(counts),
+        binrange=(edges[0], edges[-1]),
+        alpha=0.5,
+    )
+
+    kde = binned_kde(summary)
+    if kde is not None:
+        grid, density = kde
+        color = ax.patches[0].get_facecolor()[:3]
+        ax.plot(grid, density * counts.sum() * np.diff(edges)[0], color=color)
+
+    if 'counts_se' in summary:
+        ax.errorbar(
+            centers,
+            counts,
+            yerr=Z_95 * summary['counts_se'],
+            fmt='none',
+            ecolor='black',
+            elinewidth=0.5,
+        )
+
+    title = f'{col} | Skewness: {round(summary["skew"], 2)}'
+    if 'skew_se' in summary:
+        title += f' ± {round(Z_95 * summary["skew_se"], 2)}'
+    plt.title(title)
+
+
+def plot_summary_distributions(summaries: dict, n_cols: int = 4, bins: int = 50):
+    n_rows = int(np.ceil(len(summaries) / n_cols))
+
+    plt.figure(figsize=(3 * n_cols, 2 * n_rows))
+
+    for i, (col, summary) in enumerate(summaries.items(), start=1):
+        plt.subplot(n_rows, n_cols, i)
+        if summary['kind'] == 'categorical':
+            counts = summary['counts']
+            pd.Series(counts.index.astype(str)).hist(
+                weights=counts.to_numpy(), bins=bins
+            )
+            plt.title(col)
+        else:
+            _plot_summary_histogram(col, summary, bins)
+        plt.tight_layout()
+
+
+def plot_summary_countplots(summaries: dict, target: str, n_cols: int = 3):
+    cat_cols = [
+        col
+        for col, summary in summaries.items()
+        if col != target and 'by_target' in summary
+    ]
+
+    if len(cat_cols) == 0:
+        return
+
+    n_rows = int(np.ceil(len(cat_cols) / n_cols))
+    plt.figure(figsize=(4 * n_cols, 3 * n_rows))
+
+    for i, col in enumerate(cat_cols, start=1):
+        plt.subplot(n_rows, n_cols, i)
+        summary = summaries[col]
+        counts = summary['by_target'].rename('count').reset_index()
+
+        # countplot orders categories by appearance and numeric hues by value
+        order = list(summary['counts'].index)
+        hue_order = sorted(counts[target].unique())
+        ax = sns.barplot(
+            data=counts,
+            x=col,
+            y='count',
+            hue=target,
+            order=order,
+            hue_order=hue_order,
+            errorbar=None,
+        )
+
+        if 'by_target_se' in summary:
+            se = summary['by_target_se']
+            for level, container in zip(hue_order, ax.containers, strict=True):
+                for category, bar in zip(order, container, strict=True):
+                    ax.errorbar(
+                        bar.get_x() + bar.get_width() / 2,
+                        bar.get_height(),
+                        yerr=Z_95 * se.get((category, level), 0.0),
+                        fmt='none',
+                        ecolor='black',
+                        elinewidth=0.5,
+                    )
+
+        plt.title(f'{col} vs {target}')
+        plt.xticks(rotation=45)
+        plt.tight_layout()
@@ -1,28 +1,47 @@
 from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+import hashlib
+import json
 import logging
 import os
 import os.path
+import uuid
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
 import joblib
 import numpy
 import pandas as pd
+import pyarrow as pa
+from pydantic import TypeAdapter, ValidationError
 import shap
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
 from heart_failure_prediction.config import MODEL_DIR
+from heart_failure_prediction.drift import DriftMonitor
+from heart_failure_prediction.explain import aggregate_by_input, positive_class_values
+from heart_failure_prediction.serving.audit import BLOCK, AuditSink, sink_from_env
+from heart_failure_prediction.serving.columnar import (
+    ARROW_STREAM_MEDIA_TYPE,
+    ColumnValidationError,
+    read_arrow_stream,
+    validate_frame,
+    write_arrow_stream,
+)
 from heart_failure_prediction.serving.schemas import HeartDiseaseRecord
+from heart_failure_prediction.serving.static import StaticBundle
 
 logger = logging.getLogger(__name__)
 
 artifacts = {}
 
+record_list_adapter = TypeAdapter(list[HeartDiseaseRecord])
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+
+def load_artifacts(n_workers: int = 1):
     model_folder = MODEL_DIR
     model_name = 'model.joblib'
     model_path = os.path.join(model_folder, model_name)
@@ -34,6 +53,8 @@ async def lifespan(app: FastAPI):
     try:
         model = joblib.load(model_path)
         artifacts['model'] = model
+        with open(model_path, 'rb') as f:
+            artifacts['model_version'] = hashlib.file_digest(f, 'sha256').hexdigest()
         logger.info('Model loaded successfully')
     except FileNotFoundError:
         logger.error(f"Couldn't read model from path {model_path}")
@@ -52,8 +73,94 @@ async def lifespan(app: FastAPI):
     except FileNotFoundError:
         logger.error(f"Couldn't read feature names from path {features_path}")
 
+    reference_path = os.path.join(
+        MODEL_DIR, 'monitoring_artifact', 'drift_reference.json'
+    )
+
+    try:
+        with open(reference_path) as f:
+            artifacts['drift_monitor'] = DriftMonitor(json.load(f), n_workers=n_workers)
+        logger.info('Drift reference loaded successfully')
+    except FileNotFoundError:
+        logger.error(f"Couldn't read drift reference from path {reference_path}")
+
+
+def track_drift(record: dict | None = None, data: pd.DataFrame | None = None):
+    monitor: DriftMonitor = artifacts.get('drift_monitor')
+
+    if monitor is None:
+        return
+
+    if record is not None:
+        monitor.update(record)
+    else:
+        monitor.update_frame(data)
+
+
+def request_id(request: Request, response: Response) -> str:
+    # Clients join later labels to the audit log on this id
+    value = request.headers.get('x-request-id') or uuid.uuid4().hex
+    response.headers['X-Request-ID'] = value
+    return value
+
+
+def audit(endpoint: str, request_ids: list, inputs: dict, **outputs):
+    sink: AuditSink = artifacts.get('audit_sink')
+
+    if sink is None:
+        return
+
+    n_rows = len(request_ids)
+    sink.submit(
+        {
+            'request_id': request_ids,
+            'timestamp': [datetime.now(UTC)] * n_rows,
+            'endpoint': [endpoint] * n_rows,
+            'model_version': [artifacts.get('model_version')] * n_rows,
+            **inputs,
+            **outputs,
+        }
+    )
+
+
+async def audit_async(endpoint: str, request_ids: list, inputs: dict, **outputs):
+    sink: AuditSink = artifacts.get('audit_sink')
+
+    # Waiting on a full queue must not stall the event loop
+    if sink is not None and sink.policy == BLOCK:
+        await run_in_threadpool(audit, endpoint, request_ids, inputs, **outputs)
+    else:
+        audit(endpoint, request_ids, inputs, **outputs)
+
+
+def batch_response(request: Request, result: pd.DataFrame, batch_id: str):
+    if ARROW_STREAM_MEDIA_TYPE in request.headers.get('accept', ''):
+        return Response(
+            content=write_arrow_stream(result),
+            media_type=ARROW_STREAM_MEDIA_TYPE,
+            headers={'X-Request-ID': batch_id},
+        )
+
+    return {column: result[column].tolist() for column in result.columns}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A pre-forking server (see gunicorn_conf.py) loads the artifacts once in the
+    # master process, so workers start with them already shared copy-on-write
+    if not artifacts:
+        load_artifacts()
+
+    # Threads don't survive a fork, so every worker starts its own sink
+    sink = sink_from_env()
+    if sink is not None:
+        artifacts['audit_sink'] = sink
+
     yield
 
+    if sink is not None:
+        sink.close()
+
     artifacts.clear()
 
 
@@ -71,7 +178,7 @@ async def health():
 
 
 @app.post('/predict')
-async def predict(record: HeartDiseaseRecord):
+async def predict(record: HeartDiseaseRecord, request: Request, response: Response):
     model: Pipeline = artifacts.get('model')
 
     if model is None:
@@ -79,10 +186,22 @@ async def predict(record: HeartDiseaseRecord):
         raise HTTPException(status_code=503, detail='Service unavailable')
 
     try:
-        data = pd.DataFrame.from_records([record.model_dump()])
+        record_data = record.model_dump()
+        data = pd.DataFrame.from_records([record_data])
+        track_drift(record=record_data)
+
         pred = model.predict(data)
         pred_proba = model.predict_proba(data)
 
+        await audit_async(
+            'predict',
+            [request_id(request, response)],
+            {key: [value] for key, value in record_data.items()},
+            prediction=[int(pred[0])],
+            probability_positive=[float(pred_proba[0][1])],
+            probability_negative=[float(pred_proba[0][0])],
+        )
+
         return {
             'HeartDisease': int(pred[0]),
             'Probability-positive': float(pred_proba[0][1]),
@@ -94,8 +213,102 @@ async def predict(record: HeartDiseaseRecord):
         raise HTTPException(status_code=500) from e
 
 
+@app.post(
+    '/predict/batch',
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/json': {
+                    'schema': {
+                        'type': 'array',
+                        'items': {'$ref': '#/components/schemas/HeartDiseaseRecord'},
+                    }
+                },
+                ARROW_STREAM_MEDIA_TYPE: {
+                    'schema': {'type': 'string', 'format': 'binary'}
+                },
+            },
+        }
+    },
+)
+async def predict_batch(request: Request, response: Response):
+    model: Pipeline = artifacts.get('model')
+
+    if model is None:
+        logger.error("Model wasn't loaded")
+        raise HTTPException(status_code=503, detail='Service unavailable')
+
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    body = await request.body()
+
+    try:
+        if content_type == ARROW_STREAM_MEDIA_TYPE:
+            data = validate_frame(read_arrow_stream(body))
+        elif content_type == 'application/json':
+            records = record_list_adapter.validate_json(body)
+            data = pd.DataFrame.from_records(
+                [r.model_dump(mode='json') for r in records]
+            )
+        else:
+            raise HTTPException(
+                status_code=415, detail=f'Unsupported media type: {content_type}'
+            )
+    except ColumnValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors) from e
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False)) from e
+    except pa.ArrowInvalid as e:
+        raise HTTPException(status_code=400, detail='Malformed Arrow IPC stream') from e
+
+    if data.empty:
+        # Nothing to score, and drift tracking and the model reject zero rows
+        result = pd.DataFrame(
+            {
+                'request_id': pd.Series(dtype=str),
+                'HeartDisease': pd.Series(dtype=int),
+                'Probability-positive': pd.Series(dtype=float),
+                'Probability-negative': pd.Series(dtype=float),
+            }
+        )
+        return batch_response(request, result, request_id(request, response))
+
+    try:
+        track_drift(data=data)
+
+        pred_proba = model.predict_proba(data)
+        pred = model.classes_.take(pred_proba.argmax(axis=1))
+
+        batch_id = request_id(request, response)
+        row_ids = [f'{batch_id}-{i}' for i in range(len(data))]
+
+        result = pd.DataFrame(
+            {
+                'request_id': row_ids,
+                'HeartDisease': pred.astype(int),
+                'Probability-positive': pred_proba[:, 1],
+                'Probability-negative': pred_proba[:, 0],
+            }
+        )
+
+    except Exception as e:
+        logger.error(f'Error during prediction phase: {e}')
+        raise HTTPException(status_code=500) from e
+
+    await audit_async(
+        'predict_batch',
+        row_ids,
+        {column: data[column].to_numpy() for column in data.columns},
+        prediction=result['HeartDisease'].to_numpy(),
+        probability_positive=pred_proba[:, 1],
+        probability_negative=pred_proba[:, 0],
+    )
+
+    return batch_response(request, result, batch_id)
+
+
 @app.post('/explain')
-def explain(record: HeartDiseaseRecord):
+def explain(record: HeartDiseaseRecord, request: Request, response: Response):
     model: Pipeline = artifacts.get('model')
     explainer: shap.TreeExplainer = artifacts.get('explainer')
     feature_names: numpy.ndarray = artifacts.get('feature_names')
@@ -105,37 +318,31 @@ def explain(record: HeartDiseaseRecord):
         raise HTTPException(status_code=503, detail='Service unavailable')
 
     try:
-        data = pd.DataFrame.from_records([record.model_dump()])
+        record_data = record.model_dump()
+        data = pd.DataFrame.from_records([record_data])
+        track_drift(record=record_data)
+
         preprocessor: ColumnTransformer = model.named_steps['preprocessing']
         X = preprocessor.transform(data)
 
-        shap_values = explainer.shap_values(X)[0]
-
-        input_keys = record.model_dump().keys()
-
-        aggregated_shap = {key: 0.0 for key in input_keys}
-
-        for raw_name, shap_val in zip(feature_names, shap_values, strict=True):
-            clean_name = raw_name.replace('cat_pipeline__', '').replace(
-                'num_pipeline__', ''
-            )
-
-            if clean_name.startswith('missingindicator_'):
-                clean_name = clean_name.replace('missingindicator_', '')
-
-            matched_key = next(
-                (k for k in input_keys if clean_name.startswith(k)), None
-            )
-
-            if matched_key:
-                aggregated_shap[matched_key] += shap_val
-            else:
-                aggregated_shap[clean_name] = shap_val
+        shap_values = positive_class_values(explainer.shap_values(X))
+        aggregated_shap = aggregate_by_input(
+            shap_values, feature_names, list(record_data)
+        ).iloc[0]
 
         sorted_explanation = dict(
             sorted(aggregated_shap.items(), key=lambda item: abs(item[1]), reverse=True)
         )
 
+        audit(
+            'explain',
+            [request_id(request, response)],
+            {key: [value] for key, value in record_data.items()},
+            explanation=[
+                json.dumps({k: float(v) for k, v in sorted_explanation.items()})
+            ],
+        )
+
         return sorted_explanation
 
     except Exception as e:
@@ -143,13 +350,32 @@ def explain(record: HeartDiseaseRecord):
         raise HTTPException(status_code=500) from e
 
 
+@app.get('/drift')
+def drift():
+    monitor: DriftMonitor = artifacts.get('drift_monitor')
+
+    if monitor is None:
+        logger.error("Drift reference wasn't loaded")
+        raise HTTPException(status_code=503, detail='Service unavailable')
+
+    # Counts cover the requests of all workers forked from the same master
+    return monitor.scores()
+
+
 static_dir = 'static'
 
 if os.path.exists(static_dir):
-    app.mount('/assets', StaticFiles(directory=f'{static_dir}/assets'), name='assets')
+    static_bundle = StaticBundle.from_directory(static_dir)
+
+    @app.api_route('/{full_path:path}', methods=['GET', 'HEAD'])
+    async def serve_react_app(full_path: str, request: Request):
+        response = static_bundle.response(full_path, request.headers)
+
+        if response is None:
+            if full_path.startswith('assets/'):
+                raise HTTPException(status_code=404, detail='Not found')
+            response = static_bundle.response('index.html', request.headers)
 
-    @app.get('/{full_path:path}')
-    async def serve_react_app(full_path: str):
-        return FileResponse(f'{static_dir}/index.html')
+        return response
 else:
     print("⚠️ Static folder doesn't exist.")
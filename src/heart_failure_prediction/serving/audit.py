@@ -0,0 +1,250 @@
+from datetime import UTC, datetime
+import logging
+import os
+import queue
+import threading
+import time
+
+import pyarrow as pa
+
+from heart_failure_prediction.serving.columnar import COLUMN_CONSTRAINTS
+
+logger = logging.getLogger(__name__)
+
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+
+AUDIT_SUFFIX = '.arrows'
+IN_PROGRESS_SUFFIX = '.inprogress'
+
+
+def _input_type(spec: dict) -> pa.DataType:
+    if spec['allowed'] is not None:
+        return pa.string() if isinstance(spec['allowed'][0], str) else pa.int64()
+    return pa.int64() if spec['integer'] else pa.float64()
+
+
+AUDIT_SCHEMA = pa.schema(
+    [
+        ('request_id', pa.string()),
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('endpoint', pa.string()),
+        ('model_version', pa.string()),
+        *((name, _input_type(spec)) for name, spec in COLUMN_CONSTRAINTS.items()),
+        ('prediction', pa.int64()),
+        ('probability_positive', pa.float64()),
+        ('probability_negative', pa.float64()),
+        ('explanation', pa.string()),
+    ]
+)
+
+
+class AuditSink:
+    def __init__(
+        self,
+        log_dir: str,
+        max_queue: int = 10_000,
+        batch_rows: int = 1_000,
+        flush_interval: float = 1.0,
+        max_rows_per_file: int = 100_000,
+        max_file_age: float = 3600.0,
+        policy: str = DROP_NEWEST,
+        block_timeout: float = 0.05,
+        compression: str = 'zstd',
+    ):
+        if policy not in (DROP_NEWEST, DROP_OLDEST, BLOCK):
+            raise ValueError(f'Unknown backpressure policy: {policy}')
+
+        self.log_dir = log_dir
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.max_rows_per_file = max_rows_per_file
+        self.max_file_age = max_file_age
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.compression = compression
+
+        self.dropped = 0
+        self.written = 0
+        self._dropped_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='audit-sink', daemon=True
+        )
+
+        self._writer = None
+        self._sink = None
+        self._path = None
+        self._file_rows = 0
+        self._file_opened = 0.0
+        self._file_seq = 0
+
+    def start(self) -> 'AuditSink':
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def submit(self, columns: dict) -> bool:
+        # Called on the request path: never waits on disk, at most on the queue
+        # (and only with the 'block' policy, so async callers must run it off the
+        # event loop)
+        try:
+            if self.policy == BLOCK:
+                self._queue.put(columns, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(columns)
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == DROP_OLDEST:
+            try:
+                self._drop(len(self._queue.get_nowait()['request_id']))
+                self._queue.put_nowait(columns)
+                return True
+            except (queue.Empty, queue.Full):
+                pass
+
+        self._drop(len(columns['request_id']))
+        return False
+
+    def close(self, timeout: float = 10.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize(),
+            'dropped': self.dropped,
+            'written': self.written,
+        }
+
+    def _drop(self, n_rows: int):
+        # Request threads, the event loop and the writer thread all drop records
+        with self._dropped_lock:
+            self.dropped += n_rows
+            dropped = self.dropped
+
+        if dropped // 1000 != (dropped - n_rows) // 1000:
+            logger.warning(f'Audit log is behind, {dropped} records dropped')
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            chunks = self._next_batch()
+            if chunks:
+                self._write(chunks)
+            self._rotate_if_needed()
+
+        self._close_file()
+
+    def _next_batch(self) -> list[dict]:
+        try:
+            chunks = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        n_rows = len(chunks[0]['request_id'])
+        while n_rows < self.batch_rows:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            chunks.append(chunk)
+            n_rows += len(chunk['request_id'])
+
+        return chunks
+
+    def _write(self, chunks: list[dict]):
+        # A malformed chunk only costs its own records, not the whole batch
+        tables = []
+        for chunk in chunks:
+            try:
+                tables.append(self._to_table(chunk))
+            except Exception as e:
+                logger.error(f'Error while converting audit records: {e}')
+                self._drop(len(chunk['request_id']))
+
+        if not tables:
+            return
+
+        table = pa.concat_tables(tables)
+        try:
+            if self._writer is None:
+                self._open_file()
+
+            self._writer.write_table(table)
+            self._file_rows += table.num_rows
+            self.written += table.num_rows
+        except Exception as e:
+            logger.error(f'Error while writing audit log: {e}')
+            self._drop(table.num_rows)
+
+    @staticmethod
+    def _to_table(chunk: dict) -> pa.Table:
+        n_rows = len(chunk['request_id'])
+        return pa.Table.from_arrays(
+            [
+                pa.array(chunk[field.name], field.type, from_pandas=True)
+                if field.name in chunk
+                else pa.nulls(n_rows, field.type)
+                for field in AUDIT_SCHEMA
+            ],
+            schema=AUDIT_SCHEMA,
+        )
+
+    def _open_file(self):
+        timestamp = datetime.now(UTC).strftime('%Y%m%dT%H%M%S')
+        name = f'audit-{timestamp}-{os.getpid()}-{self._file_seq:04d}{AUDIT_SUFFIX}'
+        self._file_seq += 1
+
+        # An Arrow IPC stream needs no footer: every batch is on disk as soon as
+        # it is written, so a killed worker only loses the batch in flight. The
+        # suffix marks files that may still grow.
+        self._path = os.path.join(self.log_dir, name + IN_PROGRESS_SUFFIX)
+        self._sink = pa.OSFile(self._path, 'wb')
+        self._writer = pa.ipc.new_stream(
+            self._sink,
+            AUDIT_SCHEMA,
+            options=pa.ipc.IpcWriteOptions(compression=self.compression),
+        )
+        self._file_rows = 0
+        self._file_opened = time.monotonic()
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+
+        try:
+            self._writer.close()
+            self._sink.close()
+            os.rename(self._path, self._path.removesuffix(IN_PROGRESS_SUFFIX))
+        except OSError as e:
+            logger.error(f'Error while closing audit log {self._path}: {e}')
+
+        self._writer = None
+
+    def _rotate_if_needed(self):
+        if self._writer is None:
+            return
+
+        if (
+            self._file_rows >= self.max_rows_per_file
+            or time.monotonic() - self._file_opened >= self.max_file_age
+        ):
+            self._close_file()
+
+
+def sink_from_env() -> AuditSink | None:
+    log_dir = os.getenv('AUDIT_LOG_DIR')
+
+    if not log_dir:
+        return None
+
+    return AuditSink(
+        log_dir,
+        max_queue=int(os.getenv('AUDIT_QUEUE_SIZE', 10_000)),
+        policy=os.getenv('AUDIT_POLICY', DROP_NEWEST),
+    ).start()
@@ -0,0 +1,142 @@
+from enum import Enum
+import operator
+from types import NoneType, UnionType
+from typing import Literal, Union, get_args, get_origin
+
+import annotated_types
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pydantic import BaseModel
+
+from heart_failure_prediction.serving.schemas import HeartDiseaseRecord
+
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+_BOUND_OPERATORS = {
+    annotated_types.Gt: ('gt', operator.gt, 'greater than'),
+    annotated_types.Ge: ('ge', operator.ge, 'greater than or equal to'),
+    annotated_types.Lt: ('lt', operator.lt, 'less than'),
+    annotated_types.Le: ('le', operator.le, 'less than or equal to'),
+}
+
+
+class ColumnValidationError(ValueError):
+    def __init__(self, errors: list[dict]):
+        super().__init__(f'{len(errors)} column constraint(s) violated')
+        self.errors = errors
+
+
+def column_constraints(record_model: type[BaseModel] = HeartDiseaseRecord) -> dict:
+    # Derived from the pydantic fields so bulk validation follows the JSON schema
+    constraints = {}
+
+    for name, field in record_model.model_fields.items():
+        annotation = field.annotation
+        nullable = not field.is_required()
+
+        if get_origin(annotation) in (Union, UnionType):
+            args = get_args(annotation)
+            nullable = nullable or NoneType in args
+            annotation = next(arg for arg in args if arg is not NoneType)
+
+        spec = {'nullable': nullable, 'allowed': None, 'integer': False, 'bounds': []}
+
+        if get_origin(annotation) is Literal:
+            spec['allowed'] = list(get_args(annotation))
+        elif isinstance(annotation, type) and issubclass(annotation, Enum):
+            spec['allowed'] = [member.value for member in annotation]
+        else:
+            spec['integer'] = annotation is int
+            for meta in field.metadata:
+                for bound_type, (attr, op, text) in _BOUND_OPERATORS.items():
+                    if isinstance(meta, bound_type):
+                        spec['bounds'].append((op, getattr(meta, attr), text))
+
+        constraints[field.alias or name] = spec
+
+    return constraints
+
+
+COLUMN_CONSTRAINTS = column_constraints()
+
+
+def _error(column: str, msg: str, invalid: pd.Series | None = None) -> dict:
+    error = {'loc': ['body', column], 'msg': msg}
+    if invalid is not None:
+        rows = np.flatnonzero(invalid.to_numpy())
+        error['count'] = int(len(rows))
+        error['rows'] = rows[:10].tolist()
+    return error
+
+
+def validate_frame(df: pd.DataFrame, zero_is_missing: tuple = ()) -> pd.DataFrame:
+    # zero_is_missing: columns where 0 encodes a missing value (as in heart.csv),
+    # exempt from the bounds checks since ZeroImputer replaces them anyway
+    df = df.reset_index(drop=True)
+    errors = []
+    columns = {}
+
+    for name, spec in COLUMN_CONSTRAINTS.items():
+        if name not in df.columns:
+            if spec['nullable']:
+                columns[name] = pd.Series(np.nan, index=df.index)
+            else:
+                errors.append(_error(name, 'Field required'))
+            continue
+
+        column = df[name]
+        missing = column.isna()
+        skipped = missing | (column == 0) if name in zero_is_missing else missing
+
+        if missing.any() and not spec['nullable']:
+            errors.append(_error(name, 'Field required', missing))
+
+        if spec['allowed'] is not None:
+            invalid = ~(column.isin(spec['allowed']) | missing)
+            if invalid.any():
+                errors.append(
+                    _error(name, f'Input should be one of {spec["allowed"]}', invalid)
+                )
+        elif not pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(
+            column
+        ):
+            errors.append(_error(name, 'Input should be a valid number'))
+            continue
+        else:
+            if spec['integer']:
+                invalid = (column % 1 != 0) & ~missing
+                if invalid.any():
+                    errors.append(
+                        _error(name, 'Input should be a valid integer', invalid)
+                    )
+            for op, limit, text in spec['bounds']:
+                invalid = ~op(column, limit) & ~skipped
+                if invalid.any():
+                    errors.append(
+                        _error(name, f'Input should be {text} {limit}', invalid)
+                    )
+
+        columns[name] = column
+
+    if errors:
+        raise ColumnValidationError(errors)
+
+    return pd.DataFrame(columns)
+
+
+def read_arrow_stream(body: bytes) -> pd.DataFrame:
+    with pa.ipc.open_stream(body) as reader:
+        table = reader.read_all()
+
+    return table.to_pandas()
+
+
+def write_arrow_stream(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue().to_pybytes()
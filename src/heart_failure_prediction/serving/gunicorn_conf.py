@@ -0,0 +1,90 @@
+import gc
+import math
+import os
+
+from threadpoolctl import threadpool_limits
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+
+def _read_ints(*paths) -> list[int] | None:
+    try:
+        values = []
+        for path in paths:
+            with open(path) as f:
+                values.extend(int(v) if v != 'max' else -1 for v in f.read().split())
+        return values
+    except (OSError, ValueError):
+        return None
+
+
+def cpu_quota(cgroup_root: str = CGROUP_ROOT) -> float | None:
+    # cgroup v2 first, then v1; None when the container has no CPU limit
+    quota = _read_ints(os.path.join(cgroup_root, 'cpu.max')) or _read_ints(
+        os.path.join(cgroup_root, 'cpu', 'cpu.cfs_quota_us'),
+        os.path.join(cgroup_root, 'cpu', 'cpu.cfs_period_us'),
+    )
+
+    if quota is None or quota[0] <= 0:
+        return None
+    return quota[0] / quota[1]
+
+
+def available_cpus(cgroup_root: str = CGROUP_ROOT) -> int:
+    # Inside a container cpu_count() is the host's core count, not the CPUs this
+    # process may use: those are bounded by its affinity mask and the cgroup
+    # quota (the pod's CPU limit)
+    n_cpus = len(os.sched_getaffinity(0))
+    quota = cpu_quota(cgroup_root)
+
+    if quota is not None:
+        n_cpus = min(n_cpus, math.ceil(quota))
+    return max(1, n_cpus)
+
+
+# Usage: gunicorn -c src/heart_failure_prediction/serving/gunicorn_conf.py
+wsgi_app = 'heart_failure_prediction.serving.app:app'
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', available_cpus()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+timeout = int(os.getenv('WORKER_TIMEOUT', 60))
+
+# Import the app (and its heavy dependencies) in the master before forking
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker is
+    # forked. The artifacts dict is inherited by the workers, so the model and
+    # explainer pages are shared copy-on-write instead of loaded N times.
+    # No inference happens here: forking after OpenMP has started its thread
+    # pool is unsafe.
+    from heart_failure_prediction.serving.app import load_artifacts
+
+    load_artifacts(n_workers=server.cfg.workers)
+
+    # Move everything allocated so far out of the GC's reach, so collections in
+    # the workers don't write to (and thereby copy) the shared pages
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    # Every worker writes its drift counts to its own block of the shared
+    # table; a replacement worker takes over the block of the one that exited
+    taken = {getattr(w, 'drift_block', None) for w in server.WORKERS.values()}
+    free = [i for i in range(server.cfg.workers) if i not in taken]
+    worker.drift_block = free[0] if free else None
+
+
+def post_fork(server, worker):
+    # Split the cores between workers instead of letting every worker's
+    # BLAS/OpenMP pool grab all of them
+    threads = max(1, available_cpus() // server.cfg.workers)
+    threadpool_limits(limits=threads)
+    server.log.info(f'Worker {worker.pid} limited to {threads} thread(s)')
+
+    from heart_failure_prediction.serving.app import artifacts
+
+    monitor = artifacts.get('drift_monitor')
+    if monitor is not None:
+        monitor.attach(worker.drift_block)
@@ -0,0 +1,160 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+import gzip
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path
+
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Vite fingerprints everything under assets/, so those files never change in place
+HASHED_ASSETS_PREFIX = 'assets/'
+
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/javascript',
+    'application/json',
+    'application/manifest+json',
+    'image/svg+xml',
+)
+
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+ENCODING_PREFERENCE = ('br', 'gzip', 'identity')
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    media_type: str
+    etag: str
+    cache_control: str
+    variants: dict[str, bytes]
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = {'identity'}
+
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if q > 0:
+            accepted.add(coding)
+        else:
+            accepted.discard(coding)
+
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+
+def load_asset(path: Path, relative_path: str) -> StaticAsset:
+    body = path.read_bytes()
+    media_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+    variants = {'identity': body}
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+        precompressed = path.with_name(path.name + suffix)
+        if precompressed.is_file():
+            variants[encoding] = precompressed.read_bytes()
+
+    if (
+        'gzip' not in variants
+        and _is_compressible(media_type)
+        and len(body) >= MIN_COMPRESS_SIZE
+    ):
+        variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+
+    # Weak validator: every encoding of the same file shares one ETag
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL
+        if relative_path.startswith(HASHED_ASSETS_PREFIX)
+        else REVALIDATE_CACHE_CONTROL
+    )
+
+    return StaticAsset(
+        media_type=media_type,
+        etag=etag,
+        cache_control=cache_control,
+        variants=variants,
+    )
+
+
+class StaticBundle:
+    def __init__(self, assets: dict[str, StaticAsset]):
+        self.assets = assets
+
+    @classmethod
+    def from_directory(cls, directory: str | Path) -> 'StaticBundle':
+        directory = Path(directory)
+        precompressed = tuple(PRECOMPRESSED_SUFFIXES.values())
+        assets = {}
+
+        for path in sorted(directory.rglob('*')):
+            if not path.is_file() or path.name.endswith(precompressed):
+                continue
+
+            relative_path = path.relative_to(directory).as_posix()
+            assets[relative_path] = load_asset(path, relative_path)
+
+        size = sum(len(v) for a in assets.values() for v in a.variants.values())
+        logger.info(f'Loaded {len(assets)} static files ({size} bytes) into memory')
+
+        return cls(assets)
+
+    def response(self, path: str, headers: Mapping[str, str]) -> Response | None:
+        asset = self.assets.get(path)
+
+        if asset is None:
+            return None
+
+        response_headers = {
+            'ETag': asset.etag,
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and _etag_matches(if_none_match, asset.etag):
+            return Response(status_code=304, headers=response_headers)
+
+        accepted = _accepted_encodings(headers.get('accept-encoding', ''))
+        encoding = next(
+            (e for e in ENCODING_PREFERENCE if e in accepted and e in asset.variants),
+            'identity',
+        )
+
+        if encoding != 'identity':
+            response_headers['Content-Encoding'] = encoding
+
+        return Response(
+            content=asset.variants[encoding],
+            media_type=asset.media_type,
+            headers=response_headers,
+        )
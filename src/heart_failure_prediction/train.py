@@ -1,15 +1,19 @@
+import json
 import logging
 import os
 
 import hydra
 from hydra.core.hydra_config import HydraConfig
+from hydra.types import RunMode
 import joblib
 from matplotlib import pyplot as plt
 import mlflow
+import numpy as np
 from omegaconf import DictConfig
 import pandas as pd
 import seaborn as sns
 import shap
+from shap.utils._exceptions import ExplainerError
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
@@ -18,16 +22,46 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 from heart_failure_prediction.config import PROJECT_ROOT
+from heart_failure_prediction.drift import build_reference
+from heart_failure_prediction.explain import (
+    aggregate_by_input,
+    chunked_shap_values,
+    global_permutation_summary,
+    global_shap_summary,
+    make_explainer,
+    plot_global_importance,
+    plot_shap_beeswarm,
+)
+from heart_failure_prediction.ingest import ingest, load_cached
+from heart_failure_prediction.manifest import held_out_rows, write_manifest
 from heart_failure_prediction.preprocessing import ZeroImputer
 
 logger = logging.getLogger(__name__)
 
 
-def load_data(path: str) -> pd.DataFrame:
+def load_data(path: str, memory_map: bool = False) -> pd.DataFrame:
+    if path.endswith('.feather'):
+        return load_cached(path, memory_map=memory_map)
+
     df = pd.read_csv(path)
     return df
 
 
+def load_training_data(cfg: DictConfig) -> pd.DataFrame:
+    raw_path = hydra.utils.to_absolute_path(cfg.raw_data.path)
+
+    if not cfg.cache.enabled:
+        return load_data(raw_path)
+
+    cache_path = ingest(
+        raw_path,
+        cache_dir=hydra.utils.to_absolute_path(cfg.cache.dir),
+        target=cfg.model.target,
+        missing_vals_cols=list(cfg.processing.missing_vals_cols),
+    )
+    return load_data(cache_path, memory_map=cfg.cache.memory_map)
+
+
 def build_pipeline(cfg: DictConfig) -> Pipeline:
     zero_imputer_columns = list(cfg.processing.missing_vals_cols)
     num_columns = list(cfg.processing.num_features)
@@ -130,10 +164,19 @@ def log_feature_importance(pipeline, figsize=(14, 14)):
     feature_names = preprocessor.get_feature_names_out()
 
     model = pipeline.named_steps['model']
-    importances = model.feature_importances_
+
+    if hasattr(model, 'feature_importances_'):
+        importances = model.feature_importances_
+    elif hasattr(model, 'coef_'):
+        # Inputs are standardized/one-hot encoded, so coefficient magnitudes
+        # are comparable
+        importances = np.abs(model.coef_).ravel()
+    else:
+        logger.info(f'{model.__class__.__name__} has no feature importances')
+        return
 
     if len(feature_names) != len(importances):
-        print('Error: dimensions are not right.')
+        logger.error('Feature importances and feature names differ in length')
         return
 
     feature_imp_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
@@ -172,7 +215,13 @@ def log_explainer(model, X_train):
     X_train_transformed = preprocessor.transform(X_train)
     background_data = shap.sample(X_train_transformed, 100)
 
-    explainer = shap.TreeExplainer(estimator, data=background_data)
+    explainer = make_explainer(estimator, background_data)
+    if explainer is None:
+        logger.info(
+            f'No SHAP explainer for {estimator.__class__.__name__}, '
+            '/explain will be unavailable'
+        )
+        return
 
     explainer_path = os.path.join(
         HydraConfig.get().runtime.output_dir, 'explainer.joblib'
@@ -190,6 +239,79 @@ def log_explainer(model, X_train):
     logger.info('Explainer logged to MLflow')
 
 
+def log_global_explanation(cfg: DictConfig, model: Pipeline, X_train, X_test, y_test):
+    estimator = model.named_steps['model']
+    preprocessor: ColumnTransformer = model.named_steps['preprocessing']
+    output_dir = HydraConfig.get().runtime.output_dir
+    n_workers = cfg.explain.n_workers or os.cpu_count() or 1
+
+    background_data = shap.sample(
+        preprocessor.transform(X_train), cfg.explain.background_size, random_state=0
+    )
+    explainer = make_explainer(estimator, background_data)
+    summary = None
+
+    if explainer is None:
+        logger.info(
+            f'No SHAP explainer for {estimator.__class__.__name__}, '
+            'using permutation importance'
+        )
+    else:
+        try:
+            shap_values = chunked_shap_values(
+                explainer,
+                preprocessor.transform(X_test),
+                chunk_size=cfg.explain.chunk_size,
+                n_workers=n_workers,
+            )
+        except ExplainerError as e:
+            logger.warning(
+                f'SHAP values are unreliable ({e}), using permutation importance'
+            )
+        else:
+            shap_frame = aggregate_by_input(
+                shap_values, preprocessor.get_feature_names_out(), list(X_test.columns)
+            )
+            summary = global_shap_summary(shap_frame, X_test)
+
+            beeswarm_path = os.path.join(output_dir, 'shap_beeswarm.png')
+            plot_shap_beeswarm(shap_frame, X_test, beeswarm_path)
+            mlflow.log_artifact(beeswarm_path, artifact_path='explanation_artifact')
+
+    if summary is None:
+        summary = global_permutation_summary(
+            model, X_test, y_test, cfg.explain.n_repeats, n_workers
+        )
+
+    summary_path = os.path.join(output_dir, 'global_explanation.npz')
+    np.savez(summary_path, **summary)
+    mlflow.log_artifact(summary_path, artifact_path='explanation_artifact')
+
+    importance_path = os.path.join(output_dir, 'global_importance.png')
+    plot_global_importance(summary, importance_path)
+    mlflow.log_artifact(importance_path, artifact_path='explanation_artifact')
+
+    logger.info('Global explanation logged to MLflow')
+
+
+def log_drift_reference(cfg: DictConfig, X_train):
+    reference = build_reference(
+        X_train,
+        num_features=list(cfg.processing.num_features),
+        cat_features=list(cfg.processing.cat_features),
+        missing_vals_cols=list(cfg.processing.missing_vals_cols),
+    )
+
+    reference_path = os.path.join(
+        HydraConfig.get().runtime.output_dir, 'drift_reference.json'
+    )
+    with open(reference_path, 'w') as f:
+        json.dump(reference, f)
+    mlflow.log_artifact(reference_path, artifact_path='monitoring_artifact')
+
+    logger.info('Drift reference logged to MLflow')
+
+
 @hydra.main(
     config_path=os.path.join(PROJECT_ROOT, 'conf'),
     config_name='config',
@@ -198,14 +320,14 @@ def log_explainer(model, X_train):
 def main(cfg: DictConfig) -> float:
     mlflow.set_experiment('Heart failure prediction')
 
-    data = load_data(path=hydra.utils.to_absolute_path(cfg.raw_data.path))
+    data = load_training_data(cfg)
     X_train, X_test, y_train, y_test = split_data(cfg, data)
 
     model = build_pipeline(cfg)
     model_class_name = model.named_steps['model'].__class__.__name__
 
     run_name = f'{model_class_name}'
-    with mlflow.start_run(run_name=run_name):
+    with mlflow.start_run(run_name=run_name) as run:
         mlflow.log_params(cfg.model)
         mlflow.log_params(cfg.processing)
         mlflow.log_param('n_features', X_train.shape[1])
@@ -220,9 +342,27 @@ def main(cfg: DictConfig) -> float:
         mlflow.sklearn.log_model(model, name='model')
 
         log_explainer(model, X_train)
+        log_drift_reference(cfg, X_train)
+
+        # Too slow to repeat for every sweep trial
+        if cfg.explain.enabled and HydraConfig.get().mode == RunMode.RUN:
+            log_global_explanation(cfg, model, X_train, X_test, y_test)
 
         logger.info(f'Run {run_name} logged to MLflow')
 
+    # Sweep trials would overwrite each other, only plain runs become the
+    # starting point for incremental training
+    if HydraConfig.get().mode == RunMode.RUN:
+        write_manifest(
+            hydra.utils.to_absolute_path(cfg.raw_data.manifest_path),
+            data,
+            dvc_path=hydra.utils.to_absolute_path(cfg.raw_data.dvc_path),
+            run_id=run.info.run_id,
+            model_class=model_class_name,
+            scores=scores,
+            test_rows=held_out_rows(data, X_test),
+        )
+
     return scores['recall']
 
 
@@ -1,10 +1,18 @@
+import asyncio
 from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 import numpy as np
+import pandas as pd
 import pytest
 
 from heart_failure_prediction.serving.app import app
+from heart_failure_prediction.serving.audit import BLOCK
+from heart_failure_prediction.serving.columnar import (
+    ARROW_STREAM_MEDIA_TYPE,
+    read_arrow_stream,
+    write_arrow_stream,
+)
 
 client = TestClient(app)
 
@@ -143,3 +151,206 @@ def test_explain_internal_server_error(dummy_valid_data):
         response = client.post(url='/explain', json=dummy_valid_data)
 
     assert response.status_code == 500
+
+
+def test_predict_batch_accepts_json_records(dummy_valid_data):
+    model = MagicMock()
+    model.classes_ = np.array([0, 1])
+    model.predict_proba.return_value = np.array([[0.2, 0.8], [0.9, 0.1]])
+
+    with patch('heart_failure_prediction.serving.app.artifacts', {'model': model}):
+        response = client.post(
+            url='/predict/batch', json=[dummy_valid_data, dummy_valid_data]
+        )
+
+    assert response.status_code == 200
+    assert response.json()['HeartDisease'] == [1, 0]
+    assert response.json()['Probability-positive'] == [0.8, 0.1]
+
+
+def test_predict_batch_round_trips_arrow(dummy_valid_data):
+    model = MagicMock()
+    model.classes_ = np.array([0, 1])
+    model.predict_proba.return_value = np.array([[0.2, 0.8], [0.9, 0.1]])
+    body = write_arrow_stream(pd.DataFrame([dummy_valid_data, dummy_valid_data]))
+
+    with patch('heart_failure_prediction.serving.app.artifacts', {'model': model}):
+        response = client.post(
+            url='/predict/batch',
+            content=body,
+            headers={
+                'Content-Type': ARROW_STREAM_MEDIA_TYPE,
+                'Accept': ARROW_STREAM_MEDIA_TYPE,
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == ARROW_STREAM_MEDIA_TYPE
+    result = read_arrow_stream(response.content)
+    assert result['HeartDisease'].tolist() == [1, 0]
+    assert result['Probability-negative'].tolist() == [0.2, 0.9]
+
+
+def test_predict_batch_rejects_invalid_arrow_columns(dummy_invalid_data):
+    model = MagicMock()
+    body = write_arrow_stream(pd.DataFrame([dummy_invalid_data]))
+
+    with patch('heart_failure_prediction.serving.app.artifacts', {'model': model}):
+        response = client.post(
+            url='/predict/batch',
+            content=body,
+            headers={'Content-Type': ARROW_STREAM_MEDIA_TYPE},
+        )
+
+    assert response.status_code == 422
+    failed_columns = {error['loc'][1] for error in response.json()['detail']}
+    assert failed_columns == {'Age', 'RestingECG'}
+    model.predict_proba.assert_not_called()
+
+
+def test_predict_batch_returns_empty_result_for_empty_json():
+    model = MagicMock()
+    monitor = MagicMock()
+
+    artifacts = {'model': model, 'drift_monitor': monitor}
+    with patch('heart_failure_prediction.serving.app.artifacts', artifacts):
+        response = client.post(url='/predict/batch', json=[])
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'request_id': [],
+        'HeartDisease': [],
+        'Probability-positive': [],
+        'Probability-negative': [],
+    }
+    model.predict_proba.assert_not_called()
+    monitor.update_frame.assert_not_called()
+
+
+def test_predict_batch_returns_empty_result_for_empty_arrow(dummy_valid_data):
+    model = MagicMock()
+    body = write_arrow_stream(pd.DataFrame([dummy_valid_data]).iloc[:0])
+
+    with patch('heart_failure_prediction.serving.app.artifacts', {'model': model}):
+        response = client.post(
+            url='/predict/batch',
+            content=body,
+            headers={
+                'Content-Type': ARROW_STREAM_MEDIA_TYPE,
+                'Accept': ARROW_STREAM_MEDIA_TYPE,
+            },
+        )
+
+    assert response.status_code == 200
+    result = read_arrow_stream(response.content)
+    assert len(result) == 0
+    assert list(result.columns) == [
+        'request_id',
+        'HeartDisease',
+        'Probability-positive',
+        'Probability-negative',
+    ]
+    model.predict_proba.assert_not_called()
+
+
+def test_predict_batch_rejects_unsupported_media_type():
+    with patch(
+        'heart_failure_prediction.serving.app.artifacts', {'model': MagicMock()}
+    ):
+        response = client.post(
+            url='/predict/batch',
+            content=b'Age,Sex',
+            headers={'Content-Type': 'text/csv'},
+        )
+
+    assert response.status_code == 415
+
+
+def test_lifespan_keeps_preloaded_artifacts():
+    model = MagicMock()
+    artifacts = {'model': model}
+
+    with (
+        patch('heart_failure_prediction.serving.app.artifacts', artifacts),
+        patch('heart_failure_prediction.serving.app.load_artifacts') as load,
+        TestClient(app) as lifespan_client,
+    ):
+        response = lifespan_client.get('/health')
+
+    assert response.status_code == 200
+    load.assert_not_called()
+
+
+def test_predict_feeds_drift_monitor(dummy_valid_data):
+    model = MagicMock()
+    model.predict.return_value = np.array([1])
+    model.predict_proba.return_value = np.array([[0.2, 0.8]])
+    monitor = MagicMock()
+
+    artifacts = {'model': model, 'drift_monitor': monitor}
+    with patch('heart_failure_prediction.serving.app.artifacts', artifacts):
+        response = client.post(url='/predict', json=dummy_valid_data)
+
+    assert response.status_code == 200
+    monitor.update.assert_called_once()
+    assert monitor.update.call_args.args[0]['MaxHR'] == 140
+
+
+def test_drift_returns_scores():
+    monitor = MagicMock()
+    monitor.scores.return_value = {'n_records': 3}
+
+    with patch(
+        'heart_failure_prediction.serving.app.artifacts', {'drift_monitor': monitor}
+    ):
+        response = client.get('/drift')
+
+    assert response.status_code == 200
+    assert response.json() == {'n_records': 3}
+
+
+def test_drift_service_unavailable():
+    with patch('heart_failure_prediction.serving.app.artifacts', {}):
+        response = client.get('/drift')
+
+    assert response.status_code == 503
+
+
+def test_predict_submits_audit_record(dummy_valid_data):
+    model = MagicMock()
+    model.predict.return_value = np.array([1])
+    model.predict_proba.return_value = np.array([[0.2, 0.8]])
+    sink = MagicMock()
+
+    artifacts = {'model': model, 'model_version': 'abc', 'audit_sink': sink}
+    with patch('heart_failure_prediction.serving.app.artifacts', artifacts):
+        response = client.post(
+            url='/predict', json=dummy_valid_data, headers={'X-Request-ID': 'req-1'}
+        )
+
+    assert response.status_code == 200
+    assert response.headers['x-request-id'] == 'req-1'
+    record = sink.submit.call_args.args[0]
+    assert record['request_id'] == ['req-1']
+    assert record['model_version'] == ['abc']
+    assert record['probability_positive'] == [0.8]
+
+
+def test_predict_submits_blocking_audit_off_the_event_loop(dummy_valid_data):
+    model = MagicMock()
+    model.predict.return_value = np.array([1])
+    model.predict_proba.return_value = np.array([[0.2, 0.8]])
+    sink = MagicMock(policy=BLOCK)
+
+    def submit(columns):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+
+    sink.submit.side_effect = submit
+
+    artifacts = {'model': model, 'audit_sink': sink}
+    with patch('heart_failure_prediction.serving.app.artifacts', artifacts):
+        response = client.post(url='/predict', json=dummy_valid_data)
+
+    assert response.status_code == 200
+    sink.submit.assert_called_once()
@@ -0,0 +1,154 @@
+from datetime import UTC, datetime
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from heart_failure_prediction.audit_dataset import build_training_set, load_audit_log
+from heart_failure_prediction.serving.audit import DROP_NEWEST, DROP_OLDEST, AuditSink
+
+
+def audit_chunk(request_ids, endpoint='predict'):
+    n_rows = len(request_ids)
+    return {
+        'request_id': request_ids,
+        'timestamp': [datetime.now(UTC)] * n_rows,
+        'endpoint': [endpoint] * n_rows,
+        'Age': [45] * n_rows,
+        'Sex': ['M'] * n_rows,
+        'ChestPainType': ['ATA'] * n_rows,
+        'RestingBP': [130] * n_rows,
+        'Cholesterol': [None] * n_rows,
+        'FastingBS': [0] * n_rows,
+        'RestingECG': ['Normal'] * n_rows,
+        'MaxHR': [140] * n_rows,
+        'ExerciseAngina': ['N'] * n_rows,
+        'Oldpeak': [1.5] * n_rows,
+        'ST_Slope': ['Flat'] * n_rows,
+        'prediction': [1] * n_rows,
+    }
+
+
+def test_writes_rotated_files(tmp_path):
+    # GIVEN
+    sink = AuditSink(
+        str(tmp_path), batch_rows=1, max_rows_per_file=2, flush_interval=0.01
+    )
+
+    # WHEN
+    sink.start()
+    for i in range(5):
+        sink.submit(audit_chunk([f'r{i}']))
+    sink.close()
+
+    # THEN
+    logs = load_audit_log(str(tmp_path))
+    assert sorted(logs['request_id']) == ['r0', 'r1', 'r2', 'r3', 'r4']
+    assert logs['Cholesterol'].isna().all()
+    assert len(os.listdir(tmp_path)) == 3
+    assert not any(name.endswith('.inprogress') for name in os.listdir(tmp_path))
+
+
+@pytest.mark.parametrize(
+    'policy, kept', [(DROP_NEWEST, ['a', 'b']), (DROP_OLDEST, ['b', 'c'])]
+)
+def test_applies_drop_policy_when_queue_is_full(tmp_path, policy, kept):
+    # GIVEN
+    sink = AuditSink(str(tmp_path), max_queue=2, policy=policy, flush_interval=0.01)
+
+    # WHEN
+    for request_id in ['a', 'b', 'c']:
+        sink.submit(audit_chunk([request_id]))
+    sink.start()
+    sink.close()
+
+    # THEN
+    assert sink.dropped == 1
+    assert sorted(load_audit_log(str(tmp_path))['request_id']) == kept
+
+
+def test_counts_drops_from_concurrent_submitters(tmp_path):
+    # GIVEN
+    sink = AuditSink(str(tmp_path), max_queue=1)
+    sink.submit(audit_chunk(['kept']))
+
+    def submit_many():
+        for _ in range(500):
+            sink.submit(audit_chunk(['x', 'y']))
+
+    threads = [threading.Thread(target=submit_many) for _ in range(4)]
+
+    # WHEN
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # THEN
+    assert sink.dropped == 4 * 500 * 2
+
+
+def test_drops_only_the_malformed_chunk(tmp_path):
+    # GIVEN
+    sink = AuditSink(str(tmp_path), flush_interval=0.01)
+    malformed = audit_chunk(['b', 'c'])
+    malformed['Age'] = ['not a number'] * 2
+
+    # WHEN
+    for chunk in [audit_chunk(['a']), malformed, audit_chunk(['d'])]:
+        sink.submit(chunk)
+    sink.start()
+    sink.close()
+
+    # THEN
+    assert sink.dropped == 2
+    assert sorted(load_audit_log(str(tmp_path))['request_id']) == ['a', 'd']
+
+
+def test_recovers_files_of_killed_workers(tmp_path):
+    # GIVEN
+    live_dir, crashed_dir = tmp_path / 'live', tmp_path / 'crashed'
+    sink = AuditSink(str(live_dir), batch_rows=1, flush_interval=0.01).start()
+    for request_id in ['a', 'b', 'c']:
+        sink.submit(audit_chunk([request_id]))
+    while sink.written < 3:
+        time.sleep(0.01)
+
+    # WHEN
+    (path,) = live_dir.iterdir()
+    crashed_dir.mkdir()
+    (crashed_dir / path.name).write_bytes(path.read_bytes()[:-10])
+    live = load_audit_log(str(live_dir))
+    crashed = load_audit_log(str(crashed_dir))
+    sink.close()
+
+    # THEN
+    assert path.name.endswith('.inprogress')
+    assert sorted(live['request_id']) == ['a', 'b', 'c']
+    assert sorted(crashed['request_id']) == ['a', 'b']
+
+
+def test_builds_training_set_from_labels(tmp_path):
+    # GIVEN
+    log_dir = tmp_path / 'audit'
+    sink = AuditSink(str(log_dir), flush_interval=0.01).start()
+    sink.submit(audit_chunk(['a', 'b', 'c']))
+    sink.submit(audit_chunk(['a'], endpoint='explain'))
+    sink.close()
+
+    labels_path = tmp_path / 'labels.csv'
+    pd.DataFrame({'request_id': ['a', 'c'], 'HeartDisease': [1, 0]}).to_csv(
+        labels_path, index=False
+    )
+
+    # WHEN
+    dataset = build_training_set(str(log_dir), str(labels_path))
+
+    # THEN
+    assert len(dataset) == 2
+    assert dataset['HeartDisease'].tolist() == [1, 0]
+    assert dataset['Cholesterol'].tolist() == [0, 0]
+    assert dataset.columns[-1] == 'HeartDisease'
+    assert 'request_id' not in dataset.columns
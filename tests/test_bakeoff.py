@@ -0,0 +1,131 @@
+import numpy as np
+from omegaconf import OmegaConf
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+from heart_failure_prediction.bakeoff import (
+    load_model_configs,
+    run_bakeoff,
+    set_n_threads,
+    split_threads,
+)
+from heart_failure_prediction.train import split_data
+
+
+@pytest.fixture
+def dummy_data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            'age': rng.integers(30, 80, 80),
+            'creatinine': rng.choice([0.0, 0.8, 1.0, 1.5], 80),
+            'sex': rng.choice(['M', 'F'], 80),
+            'target': [0, 1] * 40,
+        }
+    )
+
+
+@pytest.fixture
+def dummy_config():
+    return OmegaConf.create(
+        {
+            'processing': {
+                'missing_vals_cols': ['creatinine'],
+                'num_features': ['age', 'creatinine'],
+                'cat_features': ['sex'],
+                'num_impute_strategy': 'median',
+                'cat_impute_strategy': 'most_frequent',
+            },
+            'model': {
+                'target': 'target',
+                'test_size': 0.25,
+                'random_state': 42,
+                'estimator': {
+                    '_target_': 'sklearn.linear_model.LogisticRegression',
+                },
+            },
+            'bakeoff': {
+                'models': [],
+                'n_workers': 2,
+                'rank_by': 'f1_score',
+                'latency_repeats': 3,
+            },
+        }
+    )
+
+
+def test_split_threads_shares_cpus(monkeypatch):
+    # GIVEN
+    monkeypatch.setattr('os.cpu_count', lambda: 8)
+
+    # WHEN + THEN
+    assert split_threads(4) == (4, 2)
+    assert split_threads(2) == (2, 4)
+    assert split_threads(4, n_workers=3) == (3, 2)
+    assert split_threads(16) == (8, 1)
+
+
+def test_set_n_threads_only_for_threaded_estimators():
+    # GIVEN
+    forest = RandomForestClassifier()
+    booster = XGBClassifier()
+    linear = LogisticRegression()
+
+    # WHEN
+    for estimator in (forest, booster, linear):
+        set_n_threads(estimator, 3)
+
+    # THEN
+    assert forest.n_jobs == 3
+    assert booster.n_jobs == 3
+    assert linear.n_jobs is None
+
+
+def test_load_model_configs():
+    # WHEN
+    configs = load_model_configs(['xgboost', 'adaboost'])
+
+    # THEN
+    assert set(configs) == {'xgboost', 'adaboost'}
+    assert configs['xgboost'].estimator._target_ == 'xgboost.XGBClassifier'
+    assert len(load_model_configs([])) >= 4
+
+    with pytest.raises(ValueError):
+        load_model_configs(['unknown'])
+
+
+def test_run_bakeoff_ranks_every_model(tmp_path, dummy_config, dummy_data):
+    # GIVEN
+    model_cfgs = {
+        'forest': OmegaConf.create(
+            {
+                'estimator': {
+                    '_target_': 'sklearn.ensemble.RandomForestClassifier',
+                    'n_estimators': 10,
+                    'random_state': 0,
+                }
+            }
+        ),
+        'linear': OmegaConf.create(
+            {'estimator': {'_target_': 'sklearn.linear_model.LogisticRegression'}}
+        ),
+    }
+    X_train, X_test, y_train, y_test = split_data(dummy_config, dummy_data)
+
+    # WHEN
+    table, pipelines = run_bakeoff(
+        dummy_config, model_cfgs, X_train, X_test, y_train, y_test, str(tmp_path)
+    )
+
+    # THEN
+    assert set(table['model']) == {'forest', 'linear'}
+    assert table['rank'].tolist() == [1, 2]
+    assert table['f1_score'].is_monotonic_decreasing
+    assert (table[['train_time_s', 'latency_ms', 'model_size_kb']] > 0).all().all()
+    assert list(tmp_path.iterdir()) == []
+
+    predictions = pipelines['forest'].predict(X_test)
+    assert len(predictions) == len(X_test)
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from heart_failure_prediction.serving.columnar import (
+    ColumnValidationError,
+    validate_frame,
+)
+
+
+@pytest.fixture
+def valid_frame():
+    return pd.DataFrame(
+        {
+            'Age': [45, 61],
+            'Sex': ['M', 'F'],
+            'ChestPainType': ['ATA', 'ASY'],
+            'RestingBP': [130, 145],
+            'Cholesterol': [230, None],
+            'FastingBS': [0, 1],
+            'RestingECG': ['Normal', 'LVH'],
+            'MaxHR': [140, 95],
+            'ExerciseAngina': ['N', 'Y'],
+            'Oldpeak': [1.5, 2.0],
+            'ST_Slope': ['Flat', 'Down'],
+        }
+    )
+
+
+def test_accepts_valid_columns(valid_frame):
+    # GIVEN
+    valid_frame['Extra'] = [1, 2]
+
+    # WHEN
+    data = validate_frame(valid_frame)
+
+    # THEN
+    assert 'Extra' not in data.columns
+    assert data['Cholesterol'].isna().tolist() == [False, True]
+
+
+def test_fills_missing_optional_column(valid_frame):
+    # GIVEN
+    frame = valid_frame.drop(columns='Cholesterol')
+
+    # WHEN
+    data = validate_frame(frame)
+
+    # THEN
+    assert data['Cholesterol'].isna().all()
+
+
+def test_reports_every_violated_constraint(valid_frame):
+    # GIVEN
+    valid_frame.loc[1, 'MaxHR'] = 250
+    valid_frame.loc[0, 'FastingBS'] = 2
+    valid_frame.loc[0, 'Sex'] = 'X'
+    frame = valid_frame.drop(columns='Oldpeak')
+
+    # WHEN + THEN
+    with pytest.raises(ColumnValidationError) as exc_info:
+        validate_frame(frame)
+
+    errors = {error['loc'][1]: error for error in exc_info.value.errors}
+    assert set(errors) == {'MaxHR', 'FastingBS', 'Sex', 'Oldpeak'}
+    assert errors['MaxHR']['rows'] == [1]
+
+
+def test_rejects_non_integer_values(valid_frame):
+    # GIVEN
+    valid_frame['Age'] = [45.5, 61.0]
+
+    # WHEN + THEN
+    with pytest.raises(ColumnValidationError):
+        validate_frame(valid_frame)
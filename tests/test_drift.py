@@ -0,0 +1,109 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heart_failure_prediction.drift import DriftMonitor, build_reference
+
+
+@pytest.fixture
+def reference_data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            'age': rng.integers(30, 80, 500),
+            'cholesterol': rng.choice([0, 180, 220, 260], 500),
+            'sex': rng.choice(['M', 'F'], 500),
+        }
+    )
+
+
+@pytest.fixture
+def monitor(reference_data):
+    reference = build_reference(
+        reference_data,
+        num_features=['age', 'cholesterol'],
+        cat_features=['sex'],
+        missing_vals_cols=['cholesterol'],
+    )
+    return DriftMonitor(reference)
+
+
+def test_no_drift_on_reference_data(monitor, reference_data):
+    # WHEN
+    monitor.update_frame(reference_data)
+    scores = monitor.scores()
+
+    # THEN
+    assert scores['n_records'] == 500
+    assert scores['numeric']['age']['psi'] == pytest.approx(0.0)
+    assert scores['numeric']['age']['ks'] == pytest.approx(0.0)
+    assert scores['categorical']['sex']['psi'] == pytest.approx(0.0)
+
+
+def test_record_and_frame_updates_agree(monitor, reference_data):
+    # GIVEN
+    other = DriftMonitor(monitor.reference)
+    sample = reference_data.head(50)
+
+    # WHEN
+    monitor.update_frame(sample)
+    for record in sample.to_dict(orient='records'):
+        other.update(record)
+
+    # THEN
+    assert np.array_equal(monitor.counts(), other.counts())
+
+
+def test_detects_shifted_inputs(monitor):
+    # WHEN
+    for _ in range(100):
+        monitor.update({'age': 85, 'cholesterol': None, 'sex': 'X'})
+    scores = monitor.scores()
+
+    # THEN
+    assert scores['numeric']['age']['psi'] > 1
+    assert scores['numeric']['age']['ks'] > 0.5
+    assert scores['categorical']['sex']['unseen_rate'] == 1.0
+    assert scores['zero_rate']['cholesterol']['current'] == 1.0
+
+
+def test_scores_without_records(monitor):
+    assert monitor.scores()['numeric'] == {}
+
+
+def test_workers_share_counts(monitor, reference_data):
+    # GIVEN
+    first = DriftMonitor(monitor.reference, n_workers=2)
+    second = DriftMonitor(monitor.reference, n_workers=2, buffer=first.buffer)
+    second.attach(1)
+
+    # WHEN
+    first.update_frame(reference_data.head(30))
+    second.update_frame(reference_data.tail(20))
+    monitor.update_frame(pd.concat([reference_data.head(30), reference_data.tail(20)]))
+
+    # THEN
+    assert first.counts()[0] == 50
+    assert np.array_equal(first.counts(), monitor.counts())
+    assert np.array_equal(second.counts(), monitor.counts())
+
+
+def test_forked_workers_share_counts(monitor, reference_data):
+    # GIVEN
+    shared = DriftMonitor(monitor.reference, n_workers=2)
+
+    def worker():
+        shared.attach(1)
+        shared.update_frame(reference_data.head(40))
+
+    # WHEN
+    process = multiprocessing.get_context('fork').Process(target=worker)
+    process.start()
+    process.join()
+    shared.update_frame(reference_data.tail(10))
+
+    # THEN
+    assert process.exitcode == 0
+    assert shared.counts()[0] == 50
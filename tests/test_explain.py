@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shap
+from sklearn.ensemble import AdaBoostClassifier
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+from heart_failure_prediction.explain import (
+    QUANTILES,
+    aggregate_by_input,
+    chunked_shap_values,
+    global_shap_summary,
+    make_explainer,
+    positive_class_values,
+)
+
+FEATURE_NAMES = [
+    'num_pipeline__age',
+    'num_pipeline__creatinine',
+    'num_pipeline__missingindicator_creatinine',
+    'cat_pipeline__sex_M',
+    'cat_pipeline__slope_Flat',
+    'cat_pipeline__slope_Up',
+]
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    return X, y
+
+
+def test_aggregate_by_input_sums_derived_features():
+    # GIVEN
+    shap_values = np.array(
+        [
+            [0.1, 0.2, 0.3, -0.4, 0.5, 0.6],
+            [1.0, 0.0, 0.0, 0.0, -1.0, 0.5],
+        ]
+    )
+
+    # WHEN
+    aggregated = aggregate_by_input(
+        shap_values, FEATURE_NAMES, ['age', 'creatinine', 'sex', 'slope', 'unused']
+    )
+
+    # THEN
+    assert list(aggregated.columns) == ['age', 'creatinine', 'sex', 'slope', 'unused']
+    np.testing.assert_allclose(aggregated.iloc[0], [0.1, 0.5, -0.4, 1.1, 0.0])
+    np.testing.assert_allclose(aggregated.iloc[1], [1.0, 0.0, 0.0, -0.5, 0.0])
+
+
+def test_aggregate_by_input_keeps_unmatched_features():
+    # WHEN
+    aggregated = aggregate_by_input(np.array([0.1, -0.2]), ['f1', 'f2'], ['age'])
+
+    # THEN
+    assert aggregated.iloc[0].to_dict() == {'age': 0.0, 'f1': 0.1, 'f2': -0.2}
+
+
+def test_positive_class_values_of_per_class_output():
+    # GIVEN
+    per_class = np.stack([-np.ones((3, 2)), np.ones((3, 2))], axis=-1)
+
+    # WHEN + THEN
+    np.testing.assert_array_equal(positive_class_values(per_class), np.ones((3, 2)))
+    np.testing.assert_array_equal(
+        positive_class_values(np.ones((3, 2))), np.ones((3, 2))
+    )
+
+
+def test_make_explainer_by_model_type(training_data):
+    # GIVEN
+    X, y = training_data
+
+    # WHEN
+    tree = make_explainer(XGBClassifier(n_estimators=5).fit(X, y), X[:20])
+    linear = make_explainer(LogisticRegression().fit(X, y), X[:20])
+    unsupported = make_explainer(AdaBoostClassifier(n_estimators=5).fit(X, y), X[:20])
+
+    # THEN
+    assert isinstance(tree, shap.TreeExplainer)
+    assert isinstance(linear, shap.LinearExplainer)
+    assert unsupported is None
+
+
+def test_chunked_shap_values_match_single_pass(training_data):
+    # GIVEN
+    X, y = training_data
+    explainer = make_explainer(XGBClassifier(n_estimators=5).fit(X, y), X[:20])
+
+    # WHEN
+    chunked = chunked_shap_values(explainer, X, chunk_size=30, n_workers=2)
+
+    # THEN
+    np.testing.assert_allclose(chunked, explainer.shap_values(X), rtol=1e-6)
+
+
+def test_global_shap_summary_arrays():
+    # GIVEN
+    shap_frame = pd.DataFrame({'age': [0.5, -1.0, 0.5], 'sex': [0.1, 0.2, -0.3]})
+    X = pd.DataFrame({'age': [40, 50, 60], 'sex': ['M', 'F', 'M']})
+
+    # WHEN
+    summary = global_shap_summary(shap_frame, X)
+
+    # THEN
+    np.testing.assert_allclose(summary['importance'], [2 / 3, 0.2])
+    assert summary['shap_quantiles'].shape == (2, len(QUANTILES))
+    assert summary['value_quantiles'][0, 0] == 40
+    assert summary['value_quantiles'][0, -1] == 60
+    assert np.isnan(summary['value_quantiles'][1]).all()
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from heart_failure_prediction.serving.gunicorn_conf import available_cpus, cpu_quota
+
+
+@pytest.mark.parametrize(
+    'cpu_max, expected', [('150000 100000\n', 1.5), ('max 100000\n', None)]
+)
+def test_reads_cgroup_v2_quota(tmp_path, cpu_max, expected):
+    # GIVEN
+    (tmp_path / 'cpu.max').write_text(cpu_max)
+
+    # WHEN + THEN
+    assert cpu_quota(str(tmp_path)) == expected
+
+
+def test_reads_cgroup_v1_quota(tmp_path):
+    # GIVEN
+    (tmp_path / 'cpu').mkdir()
+    (tmp_path / 'cpu' / 'cpu.cfs_quota_us').write_text('200000\n')
+    (tmp_path / 'cpu' / 'cpu.cfs_period_us').write_text('100000\n')
+
+    # WHEN + THEN
+    assert cpu_quota(str(tmp_path)) == 2.0
+
+
+def test_available_cpus_is_bounded_by_quota_and_affinity(tmp_path):
+    # GIVEN
+    (tmp_path / 'cpu.max').write_text('50000 100000\n')
+
+    # WHEN + THEN
+    assert available_cpus(str(tmp_path)) == 1
+    assert available_cpus(str(tmp_path / 'missing')) == len(os.sched_getaffinity(0))
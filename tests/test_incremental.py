@@ -0,0 +1,168 @@
+import numpy as np
+from omegaconf import OmegaConf
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+
+from heart_failure_prediction.incremental import (
+    IncrementalUpdateError,
+    check_preprocessing,
+    continue_training,
+    train_incremental,
+)
+from heart_failure_prediction.manifest import appended_rows, held_out_rows, rows_hash
+from heart_failure_prediction.train import build_pipeline, split_data
+
+
+@pytest.fixture
+def dummy_data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            'age': rng.integers(30, 80, 60),
+            'creatinine': rng.choice([0.0, 0.8, 1.0, 1.5], 60),
+            'sex': rng.choice(['M', 'F'], 60),
+            'target': [0, 1] * 30,
+        }
+    )
+
+
+@pytest.fixture
+def dummy_config():
+    return OmegaConf.create(
+        {
+            'processing': {
+                'missing_vals_cols': ['creatinine'],
+                'num_features': ['age', 'creatinine'],
+                'cat_features': ['sex'],
+                'num_impute_strategy': 'median',
+                'cat_impute_strategy': 'most_frequent',
+            },
+            'model': {
+                'estimator': {
+                    '_target_': 'sklearn.ensemble.RandomForestClassifier',
+                    'n_estimators': 5,
+                    'random_state': 42,
+                },
+            },
+        }
+    )
+
+
+def test_detects_appended_rows(dummy_data):
+    # GIVEN
+    manifest = {
+        'n_rows': 40,
+        'rows_hash': rows_hash(dummy_data.iloc[:40]),
+        'columns': list(dummy_data.columns),
+    }
+
+    # WHEN
+    new_rows = appended_rows(dummy_data, manifest)
+
+    # THEN
+    assert new_rows.index.tolist() == list(range(40, 60))
+
+
+def test_rejects_edited_history(dummy_data):
+    # GIVEN
+    manifest = {
+        'n_rows': 40,
+        'rows_hash': rows_hash(dummy_data.iloc[:40]),
+        'columns': list(dummy_data.columns),
+    }
+    dummy_data.loc[3, 'age'] = 99
+
+    # WHEN + THEN
+    assert appended_rows(dummy_data, manifest) is None
+
+
+def test_keeps_preprocessing_frozen(dummy_config, dummy_data):
+    # GIVEN
+    X, y = dummy_data.drop(columns='target'), dummy_data['target']
+    pipeline = build_pipeline(dummy_config).fit(X.iloc[:40], y.iloc[:40])
+    preprocessor = pipeline.named_steps['preprocessing']
+    expected = preprocessor.transform(X)
+
+    # WHEN
+    check_preprocessing(preprocessor, X.iloc[40:])
+
+    # THEN
+    np.testing.assert_array_equal(preprocessor.transform(X), expected)
+
+
+def test_rejects_new_categories(dummy_config, dummy_data):
+    # GIVEN
+    X, y = dummy_data.drop(columns='target'), dummy_data['target']
+    pipeline = build_pipeline(dummy_config).fit(X.iloc[:40], y.iloc[:40])
+    X_new = X.iloc[40:].assign(sex='U')
+
+    # WHEN + THEN
+    with pytest.raises(IncrementalUpdateError):
+        check_preprocessing(pipeline.named_steps['preprocessing'], X_new)
+
+
+def test_continues_boosting_from_previous_booster():
+    # GIVEN
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(80, 3)), np.array([0, 1] * 40)
+    estimator = XGBClassifier(n_estimators=10).fit(X[:60], y[:60])
+
+    # WHEN
+    continue_training(estimator, X[60:], y[60:], n_new_estimators=5)
+
+    # THEN
+    assert estimator.get_booster().num_boosted_rounds() == 15
+
+
+def test_rejects_estimators_without_warm_start():
+    # GIVEN
+    estimator = build_pipeline(
+        OmegaConf.create(
+            {
+                'processing': {
+                    'missing_vals_cols': [],
+                    'num_features': ['a'],
+                    'cat_features': [],
+                    'num_impute_strategy': 'median',
+                    'cat_impute_strategy': 'most_frequent',
+                },
+                'model': {
+                    'estimator': {'_target_': 'sklearn.ensemble.AdaBoostClassifier'}
+                },
+            }
+        )
+    ).named_steps['model']
+    estimator.classes_ = np.array([0, 1])
+
+    # WHEN + THEN
+    with pytest.raises(IncrementalUpdateError):
+        continue_training(estimator, np.zeros((4, 1)), np.array([0, 1, 0, 1]), 5)
+
+
+def test_never_evaluates_on_trained_rows(dummy_config, dummy_data):
+    # GIVEN
+    cfg = OmegaConf.merge(
+        dummy_config,
+        {
+            'model': {'target': 'target', 'test_size': 0.25, 'random_state': 0},
+            'incremental': {'n_new_estimators': 2, 'gate': False},
+        },
+    )
+    X_train, X_test, y_train, _ = split_data(cfg, dummy_data.iloc[:30])
+    model = build_pipeline(cfg).fit(X_train, y_train)
+    manifest = {'n_rows': 30, 'test_rows': held_out_rows(dummy_data, X_test)}
+    trained = set(X_train.index)
+
+    # WHEN
+    for n_rows in (45, 60):
+        data = dummy_data.iloc[:n_rows]
+        model, _, _, _, X_train, X_test, _ = train_incremental(
+            cfg, model, data, manifest
+        )
+        manifest = {'n_rows': n_rows, 'test_rows': held_out_rows(data, X_test)}
+
+        # THEN
+        assert trained <= set(X_train.index)
+        assert not set(X_train.index) & set(X_test.index)
+        trained |= set(X_train.index)
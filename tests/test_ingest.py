@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heart_failure_prediction.ingest import ingest, load_cached, to_typed, validate_raw
+from heart_failure_prediction.serving.columnar import ColumnValidationError
+
+MISSING_VALS_COLS = ['Cholesterol', 'RestingBP']
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            'Age': [45, 61, 52],
+            'Sex': ['M', 'F', 'M'],
+            'ChestPainType': ['ATA', 'ASY', 'NAP'],
+            'RestingBP': [130, 0, 120],
+            'Cholesterol': [230, 0, 180],
+            'FastingBS': [0, 1, 0],
+            'RestingECG': ['Normal', 'LVH', 'ST'],
+            'MaxHR': [140, 95, 160],
+            'ExerciseAngina': ['N', 'Y', 'N'],
+            'Oldpeak': [1.5, 2.0, 0.1],
+            'ST_Slope': ['Flat', 'Down', 'Up'],
+            'HeartDisease': [0, 1, 0],
+        }
+    )
+
+
+@pytest.fixture
+def raw_csv(tmp_path, raw_frame):
+    path = tmp_path / 'heart.csv'
+    raw_frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_accepts_zero_as_missing_measurement(raw_frame):
+    # WHEN + THEN
+    validate_raw(raw_frame, 'HeartDisease', MISSING_VALS_COLS)
+
+
+def test_rejects_invalid_raw_rows(raw_frame):
+    # GIVEN
+    raw_frame.loc[0, 'HeartDisease'] = 2
+    raw_frame.loc[2, 'MaxHR'] = 0
+
+    # WHEN + THEN
+    with pytest.raises(ColumnValidationError) as exc_info:
+        validate_raw(raw_frame, 'HeartDisease', MISSING_VALS_COLS)
+
+    fields = {error['loc'][1] for error in exc_info.value.errors}
+    assert fields == {'HeartDisease', 'MaxHR'}
+
+
+def test_to_typed_uses_compact_dtypes(raw_frame):
+    # WHEN
+    typed = to_typed(raw_frame, 'HeartDisease')
+
+    # THEN
+    assert list(typed['ChestPainType'].cat.categories) == ['TA', 'ATA', 'NAP', 'ASY']
+    assert typed['Age'].dtype == np.int8
+    assert typed['Cholesterol'].dtype == np.int16
+    assert typed['HeartDisease'].dtype == np.int8
+    # 0.1 has no exact float32 representation
+    assert typed['Oldpeak'].dtype == np.float64
+
+
+def test_ingest_reuses_cache_until_data_changes(tmp_path, raw_csv, raw_frame):
+    # GIVEN
+    cache_dir = str(tmp_path / 'processed')
+    path = ingest(raw_csv, cache_dir, 'HeartDisease', MISSING_VALS_COLS)
+    mtime = os.path.getmtime(path)
+
+    # WHEN
+    cached_again = ingest(raw_csv, cache_dir, 'HeartDisease', MISSING_VALS_COLS)
+    raw_frame.iloc[:1].to_csv(raw_csv, mode='a', header=False, index=False)
+    appended = ingest(raw_csv, cache_dir, 'HeartDisease', MISSING_VALS_COLS)
+
+    # THEN
+    assert cached_again == path
+    assert os.path.getmtime(path) == mtime
+    assert appended != path
+    assert len(load_cached(appended)) == len(raw_frame) + 1
+
+
+@pytest.mark.parametrize('memory_map', [True, False])
+def test_load_cached_round_trips_values(tmp_path, raw_csv, raw_frame, memory_map):
+    # GIVEN
+    path = ingest(raw_csv, str(tmp_path), 'HeartDisease', MISSING_VALS_COLS)
+
+    # WHEN
+    df = load_cached(path, memory_map=memory_map)
+
+    # THEN
+    pd.testing.assert_frame_equal(df.astype(raw_frame.dtypes), raw_frame)
+
+
+def test_ingest_detects_same_size_edit(tmp_path, raw_csv):
+    # GIVEN
+    cache_dir = str(tmp_path / 'processed')
+    path = ingest(raw_csv, cache_dir, 'HeartDisease', MISSING_VALS_COLS)
+
+    with open(raw_csv) as f:
+        content = f.read()
+    edited = content.replace('45,M', '41,M', 1)
+    assert len(edited) == len(content)
+    with open(raw_csv, 'w') as f:
+        f.write(edited)
+
+    # WHEN
+    edited_path = ingest(raw_csv, cache_dir, 'HeartDisease', MISSING_VALS_COLS)
+
+    # THEN
+    assert edited_path != path
+    assert load_cached(edited_path)['Age'].iloc[0] == 41
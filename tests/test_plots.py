@@ -0,0 +1,146 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from heart_failure_prediction import plots
+
+
+@pytest.fixture
+def dummy_data():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame(
+        {
+            'age': rng.integers(28, 78, n),
+            'oldpeak': rng.gamma(1.5, 0.8, n).round(1),
+            'sex': rng.choice(['M', 'F'], n, p=[0.8, 0.2]),
+            'slope': rng.choice(['Up', 'Flat', 'Down'], n),
+            'target': rng.integers(0, 2, n),
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def close_figures():
+    yield
+    plt.close('all')
+
+
+def test_merged_moments_match_pandas_skew(dummy_data):
+    # GIVEN
+    values = dummy_data['oldpeak'].to_numpy(dtype=float)
+
+    # WHEN
+    merged = plots.moments(values[:0])
+    for chunk in np.array_split(values, 7):
+        merged = plots.merge_moments(merged, plots.moments(chunk))
+
+    # THEN
+    assert merged['n'] == len(values)
+    assert plots.skewness(merged) == pytest.approx(dummy_data['oldpeak'].skew())
+
+
+def test_chunked_csv_matches_in_memory_summary(tmp_path, dummy_data):
+    # GIVEN
+    path = tmp_path / 'data.csv'
+    dummy_data.to_csv(path, index=False)
+
+    # WHEN
+    in_memory = plots.summarize(dummy_data, target='target')
+    chunked = plots.summarize_csv(str(path), target='target', chunksize=64, n_jobs=2)
+
+    # THEN
+    for col in ('age', 'oldpeak'):
+        np.testing.assert_array_equal(chunked[col]['counts'], in_memory[col]['counts'])
+        np.testing.assert_allclose(chunked[col]['edges'], in_memory[col]['edges'])
+        assert chunked[col]['skew'] == pytest.approx(in_memory[col]['skew'])
+
+    pd.testing.assert_series_equal(
+        chunked['slope']['counts'], in_memory['slope']['counts']
+    )
+    pd.testing.assert_series_equal(
+        chunked['sex']['by_target'], in_memory['sex']['by_target']
+    )
+
+
+def test_aggregated_distributions_match_seaborn(dummy_data):
+    # GIVEN
+    plots.plot_distributions(dummy_data)
+    expected = plt.gcf().axes
+
+    # WHEN
+    plots.plot_distributions(dummy_data, aggregate=True, n_jobs=2)
+    actual = plt.gcf().axes
+
+    # THEN
+    for expected_ax, actual_ax in zip(expected, actual, strict=True):
+        assert actual_ax.get_title() == expected_ax.get_title()
+        np.testing.assert_allclose(
+            [p.get_height() for p in actual_ax.patches],
+            [p.get_height() for p in expected_ax.patches],
+        )
+        for expected_line, actual_line in zip(
+            expected_ax.lines, actual_ax.lines, strict=True
+        ):
+            np.testing.assert_allclose(
+                actual_line.get_xdata(), expected_line.get_xdata()
+            )
+            kde = expected_line.get_ydata()
+            np.testing.assert_allclose(
+                actual_line.get_ydata(), kde, atol=0.01 * kde.max()
+            )
+
+
+def test_aggregated_countplots_match_seaborn(dummy_data):
+    # GIVEN
+    plots.plot_categorical_countplots(dummy_data, 'target')
+    expected = plt.gcf().axes
+
+    # WHEN
+    plots.plot_categorical_countplots(dummy_data, 'target', aggregate=True)
+    actual = plt.gcf().axes
+
+    # THEN
+    for expected_ax, actual_ax in zip(expected, actual, strict=True):
+        assert actual_ax.get_title() == expected_ax.get_title()
+        assert [t.get_text() for t in actual_ax.get_xticklabels()] == [
+            t.get_text() for t in expected_ax.get_xticklabels()
+        ]
+        assert [p.get_height() for p in actual_ax.patches] == [
+            p.get_height() for p in expected_ax.patches
+        ]
+
+
+def test_sampled_summary_has_error_bounds(dummy_data):
+    # WHEN
+    summaries = plots.summarize(dummy_data, target='target', sample_frac=0.5)
+
+    # THEN
+    age = summaries['age']
+    total_se = np.sqrt((age['counts_se'] ** 2).sum())
+    assert 0 < age['n'] < len(dummy_data)
+    assert abs(age['counts'].sum() - len(dummy_data)) < 4 * total_se
+    assert age['counts_se'].shape == age['counts'].shape
+    assert age['skew_se'] > 0
+
+    sex = summaries['sex']
+    estimate, se = sex['counts']['M'], sex['counts_se']['M']
+    assert abs(estimate - (dummy_data['sex'] == 'M').sum()) < 4 * se
+
+
+def test_aggregated_distributions_of_all_missing_column():
+    # GIVEN
+    df = pd.DataFrame({'a': [1.0, 2, 3, 4], 'b': [np.nan] * 4})
+    plots.plot_distributions(df)
+    expected = plt.gcf().axes
+
+    # WHEN
+    plots.plot_distributions(df, aggregate=True)
+    actual = plt.gcf().axes
+
+    # THEN
+    for expected_ax, actual_ax in zip(expected, actual, strict=True):
+        assert actual_ax.get_title() == expected_ax.get_title()
+        assert len(actual_ax.lines) == len(expected_ax.lines)
+        assert actual_ax.get_xlim() == expected_ax.get_xlim()
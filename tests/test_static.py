@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+
+from heart_failure_prediction.serving.static import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    StaticBundle,
+)
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'index.html').write_text('<html></html>')
+    (tmp_path / 'assets' / 'index-abc123.js').write_text('console.log(1);' * 200)
+    (tmp_path / 'assets' / 'index-abc123.css').write_text('body{}')
+    (tmp_path / 'assets' / 'index-abc123.css.br').write_bytes(b'brotli-bytes')
+    return StaticBundle.from_directory(tmp_path)
+
+
+def test_serves_gzip_when_accepted(bundle):
+    # WHEN
+    response = bundle.response(
+        'assets/index-abc123.js', {'accept-encoding': 'gzip, deflate'}
+    )
+
+    # THEN
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['cache-control'] == IMMUTABLE_CACHE_CONTROL
+    assert gzip.decompress(response.body) == b'console.log(1);' * 200
+
+
+def test_prefers_precompressed_brotli(bundle):
+    # WHEN
+    response = bundle.response(
+        'assets/index-abc123.css', {'accept-encoding': 'gzip, br'}
+    )
+
+    # THEN
+    assert response.headers['content-encoding'] == 'br'
+    assert response.body == b'brotli-bytes'
+    assert 'assets/index-abc123.css.br' not in bundle.assets
+
+
+def test_serves_identity_without_accept_encoding(bundle):
+    # WHEN
+    response = bundle.response('index.html', {})
+
+    # THEN
+    assert 'content-encoding' not in response.headers
+    assert response.headers['cache-control'] == REVALIDATE_CACHE_CONTROL
+    assert response.body == b'<html></html>'
+
+
+def test_returns_not_modified_for_matching_etag(bundle):
+    # GIVEN
+    etag = bundle.response('index.html', {}).headers['etag']
+
+    # WHEN
+    response = bundle.response('index.html', {'if-none-match': etag})
+
+    # THEN
+    assert response.status_code == 304
+    assert response.body == b''
+
+
+def test_returns_none_for_unknown_path(bundle):
+    assert bundle.response('missing.js', {}) is None